@@ -1,10 +1,26 @@
 import pygame as pg
 import random
 import os
+import gc
+import time
+import queue
+import asyncio
+import argparse
+import threading
+from collections import deque
+from bisect import bisect_left, insort
+import sqlite3
+import struct
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # optional: ParticleSystem falls back to array.array columns
+    np = None
 
 pg.init()
 
-# ===============CONSTANTS 
+# ===============CONSTANTS
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 400
 FPS = 60
@@ -12,9 +28,173 @@ GROUND_TOP = 354
 WORLD_SCROLL_SPEED = 5
 PLATFORM_HEIGHT = 16
 PLATFORM_WIDTH = 64
+FIRE_POOL_PREWARM = 64  # fires created up front so spawning one mid-run is just a reset
+HEAL_POOL_PREWARM = 16
+MAP_ROW_H = 16  # height of one row in a tile map level file
+RUN_DB_PATH = "runs.db"  # local run history / leaderboard store
+REWIND_FRAMES = 5 * FPS  # per-tick snapshots kept for rewinding
+GHOST_ALPHA = 110  # opacity of other racers' ghosts
+
+
+# =========== OBJECT POOL
+class Pool:
+    """Free list of reusable objects with explicit acquire/release.
+    Objects must provide reset(*args); acquire() only calls the factory when the free list is empty."""
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            self.reused += 1
+        else:
+            obj = self.factory()
+            self.created += 1
+        obj.reset(*args)
+        return obj
+
+    def prewarm(self, n):
+        """Create n objects ahead of time so acquire() does not have to during play."""
+        for _ in range(n):
+            self.free.append(self.factory())
+        self.created += n
+
+    def release(self, obj):
+        self.free.append(obj)
+
+    def release_all(self, objs):
+        self.free.extend(objs)
+        objs.clear()
+
+
+# =========== PERF MONITOR
+class PerfMonitor:
+    """Per-frame timing plus GC pause and allocation counters.
+    Allocations are the net count of GC-tracked objects (what triggers a gen0 collection),
+    read from gc.get_count() and carried across collections via gc.callbacks."""
+    def __init__(self):
+        self.frame_ms = 0.0
+        self.frame_allocs = 0
+        self.gc_pauses = 0
+        self.gc_pause_total_ms = 0.0
+        self.gc_pause_max_ms = 0.0
+        self.show = False
+        self.governor = None  # QualityGovernor registers itself here
+        self._alloc_base = 0
+        self._gc_start = 0.0
+        self._frame_start = 0.0
+        self._frame_alloc_start = 0
+        self.start_run()
+        gc.callbacks.append(self._on_gc)
+
+    def start_run(self):
+        """Reset the per-run aggregates reported by run_stats()."""
+        self.run_frames = 0
+        self.run_frame_ms_total = 0.0
+        self.run_frame_ms_max = 0.0
+        self._run_gc_base = self.gc_pauses
+
+    def run_stats(self):
+        return {
+            "frames": self.run_frames,
+            "avg_frame_ms": self.run_frame_ms_total / self.run_frames if self.run_frames else 0.0,
+            "max_frame_ms": self.run_frame_ms_max,
+            "gc_pauses": self.gc_pauses - self._run_gc_base,
+        }
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            # gen0 counter is reset by the collection, so bank it first
+            self._alloc_base += gc.get_count()[0]
+            self._gc_start = time.perf_counter()
+        else:
+            pause = (time.perf_counter() - self._gc_start) * 1000
+            self.gc_pauses += 1
+            self.gc_pause_total_ms += pause
+            self.gc_pause_max_ms = max(self.gc_pause_max_ms, pause)
+
+    def alloc_count(self):
+        return self._alloc_base + gc.get_count()[0]
+
+    def begin_frame(self):
+        self._frame_start = time.perf_counter()
+        self._frame_alloc_start = self.alloc_count()
+
+    def end_frame(self):
+        self.frame_ms = (time.perf_counter() - self._frame_start) * 1000
+        self.frame_allocs = self.alloc_count() - self._frame_alloc_start
+        self.run_frames += 1
+        self.run_frame_ms_total += self.frame_ms
+        self.run_frame_ms_max = max(self.run_frame_ms_max, self.frame_ms)
+
+    def close(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+
+# =========== QUALITY GOVERNOR
+# Optional rendering work, from cheapest (0) to full quality (last entry)
+QUALITY_LEVELS = [
+    {"name": "minimal", "heart_pulse": False, "fire_anim_rate": 0.0, "background": False, "reveal_overlay": False, "particles": 0.1},
+    {"name": "low", "heart_pulse": False, "fire_anim_rate": 0.5, "background": False, "reveal_overlay": True, "particles": 0.25},
+    {"name": "medium", "heart_pulse": False, "fire_anim_rate": 1.0, "background": True, "reveal_overlay": True, "particles": 0.5},
+    {"name": "high", "heart_pulse": True, "fire_anim_rate": 1.0, "background": True, "reveal_overlay": True, "particles": 1.0},
+]
+
+
+class QualityGovernor:
+    """Sheds optional rendering work when frames run long and restores it when there is headroom.
+
+    Keeps an exponential moving average of the measured frame work time. Above `high`
+    (fraction of the frame budget) for `degrade_after` frames it drops one level; below `low`
+    for `restore_after` frames it climbs one level. Restoring is deliberately slower than
+    degrading so the level does not oscillate. Decisions are kept in `history` and the
+    governor registers itself on the PerfMonitor so the F3 overlay can show it."""
+    def __init__(self, perf, high=0.85, low=0.5, degrade_after=30, restore_after=180):
+        self.budget_ms = 1000 / FPS
+        self.high = high
+        self.low = low
+        self.degrade_after = degrade_after
+        self.restore_after = restore_after
+        self.level = len(QUALITY_LEVELS) - 1
+        self.settings = QUALITY_LEVELS[self.level]
+        self.ema_ms = 0.0
+        self.frames = 0
+        self._over = 0
+        self._under = 0
+        self.history = deque(maxlen=50)  # (frame, old level, new level, ema_ms)
+        perf.governor = self
+
+    def update(self, frame_ms):
+        """Feed one frame's work time; returns True when the quality level changed."""
+        self.frames += 1
+        self.ema_ms += (frame_ms - self.ema_ms) * 0.1
+        load = self.ema_ms / self.budget_ms
+        self._over = self._over + 1 if load > self.high else 0
+        self._under = self._under + 1 if load < self.low else 0
+        if self._over >= self.degrade_after and self.level > 0:
+            self.set_level(self.level - 1)
+            return True
+        if self._under >= self.restore_after and self.level < len(QUALITY_LEVELS) - 1:
+            self.set_level(self.level + 1)
+            return True
+        return False
+
+    def set_level(self, level):
+        self.history.append((self.frames, self.level, level, round(self.ema_ms, 2)))
+        self.level = level
+        self.settings = QUALITY_LEVELS[level]
+        self._over = 0
+        self._under = 0
+
 
 # =============PLAYER CLASS 
 class Player(pg.sprite.Sprite):
+    frame_sets = None
+
     def __init__(self, x, y):
         super().__init__()
         self.size = 32
@@ -32,6 +212,7 @@ class Player(pg.sprite.Sprite):
         self.facing_right = True
         self.running = False
         self.in_air = False
+        self.just_landed = False
         self.anim_index = 0
         self.hp = 3
         
@@ -42,6 +223,17 @@ class Player(pg.sprite.Sprite):
         self.load_sprites()
     
     def load_sprites(self):
+        # Frames are loaded once and shared by every Player, including ghosts (see frame_sets)
+        if Player.frame_sets is None:
+            Player.frame_sets = self.build_frame_sets()
+        self.idle_frames, self.run_frames, self.jump_image = Player.frame_sets[(False, True)]
+
+    def build_frame_sets(self):
+        """Load the sprite sheets and pre-build every variant the game draws: flipped for
+        facing left and translucent for ghosts, so draw() never transforms a surface.
+        Keyed by (ghost, facing_right); each value is (idle_frames, run_frames, jump_image)."""
+        idle_frames = []
+        run_frames = []
         # Load idle animation sheet if present, otherwise use fallback surface
         idle_path = "assets/MainCharacters/VirtualGuy/idle.png"
         if os.path.exists(idle_path):
@@ -49,10 +241,10 @@ class Player(pg.sprite.Sprite):
             _, _, w, h = idle_sheet.get_rect()
             for i in range(max(1, w // self.size)):
                 surf = idle_sheet.subsurface(i * self.size, 0, self.size, self.size)
-                self.idle_frames.append(surf)
+                idle_frames.append(surf)
         else:
-            self.idle_frames = [pg.Surface((self.size, self.size))]
-            self.idle_frames[0].fill((0, 100, 255))
+            idle_frames = [pg.Surface((self.size, self.size))]
+            idle_frames[0].fill((0, 100, 255))
 
         # Load run animation sheet if present, otherwise use fallback surface
         run_path = "assets/MainCharacters/VirtualGuy/run.png"
@@ -61,18 +253,36 @@ class Player(pg.sprite.Sprite):
             _, _, rw, rh = run_sheet.get_rect()
             for i in range(max(1, rw // self.size)):
                 surf = run_sheet.subsurface(i * self.size, 0, self.size, self.size)
-                self.run_frames.append(surf)
+                run_frames.append(surf)
         else:
-            self.run_frames = [pg.Surface((self.size, self.size))]
-            self.run_frames[0].fill((0, 150, 255))
+            run_frames = [pg.Surface((self.size, self.size))]
+            run_frames[0].fill((0, 150, 255))
 
         # Load jump image if present, otherwise use fallback
         jump_path = "assets/MainCharacters/VirtualGuy/jump.png"
         if os.path.exists(jump_path):
-            self.jump_image = pg.image.load(jump_path).convert_alpha()
+            jump_image = pg.image.load(jump_path).convert_alpha()
         else:
-            self.jump_image = pg.Surface((self.size, self.size))
-            self.jump_image.fill((100, 200, 255))
+            jump_image = pg.Surface((self.size, self.size))
+            jump_image.fill((100, 200, 255))
+
+        def variant(image, ghost, facing_right):
+            if not facing_right:
+                image = pg.transform.flip(image, True, False)
+            if ghost:
+                image = image.copy()
+                image.set_alpha(GHOST_ALPHA)
+            return image
+
+        frame_sets = {}
+        for ghost in (False, True):
+            for facing_right in (True, False):
+                frame_sets[(ghost, facing_right)] = (
+                    [variant(f, ghost, facing_right) for f in idle_frames],
+                    [variant(f, ghost, facing_right) for f in run_frames],
+                    variant(jump_image, ghost, facing_right),
+                )
+        return frame_sets
     
     def jump(self):
         if self.jump_count < self.max_jumps:
@@ -114,50 +324,68 @@ class Player(pg.sprite.Sprite):
                 self.in_air = True
                 break
 
+        # Landing this frame (used for dust particles)
+        self.just_landed = self.in_air and self.on_ground
         self.in_air = not self.on_ground
     
     def update(self, platform_rects, running):
         self.running = running
         self.apply_gravity_and_collisions(platform_rects)
     
-    def draw(self, surface):
+    def draw(self, surface, ghost=False, offset_x=0):
+        # Pre-flipped (and, for ghosts, translucent) frames; nothing is transformed per frame
+        idle_frames, run_frames, jump_image = Player.frame_sets[(ghost, self.facing_right)]
         if self.in_air:
-            image = self.jump_image
+            image = jump_image
         elif self.running:
-            if self.anim_index >= len(self.run_frames) - 0.3:
+            if self.anim_index >= len(run_frames) - 0.3:
                 self.anim_index = 0
-            image = self.run_frames[int(self.anim_index)]
+            image = run_frames[int(self.anim_index)]
             self.anim_index += 0.3
         else:
-            if self.anim_index >= len(self.idle_frames) - 0.3:
+            if self.anim_index >= len(idle_frames) - 0.3:
                 self.anim_index = 0
-            image = self.idle_frames[int(self.anim_index)]
+            image = idle_frames[int(self.anim_index)]
             self.anim_index += 0.3
         
-        # Flip image when facing left
-        if not self.facing_right:
-            image = pg.transform.flip(image, True, False)
-        
-        surface.blit(image, self.rect)
+        if offset_x:
+            surface.blit(image, (self.rect.x + offset_x, self.rect.y))
+        else:
+            surface.blit(image, self.rect)
 
 
 # =========== FIRE TRAP CLASS 
 class FireTrap(pg.sprite.Sprite):
-    def __init__(self, x, y, always_visible=False):
+    # Surfaces shared by every fire; loaded from disk by the first one (see load_fire_images)
+    images = None
+    # Animation speed multiplier shared by all fires (lowered by the QualityGovernor)
+    anim_rate = 1.0
+
+    def __init__(self, x=0, y=0, always_visible=False):
         super().__init__()
-        self.world_x = x
-        self.world_y = y  # Above platform surface
         self.size = 32
         self.rect = pg.Rect(0, 0, self.size, self.size)
+        self.load_fire_images()
+        self.reset(x, y, always_visible)
+
+    def reset(self, x, y, always_visible=False):
+        """Reinitialise per-instance state so a pooled fire can be reused."""
+        self.world_x = x
+        self.world_y = y  # Above platform surface
         self.always_visible = always_visible
         self.animation_frame = 0
+        self.anim_index = 0
         self.is_hit = False
         self.hit_timer = 0
-        self.load_fire_images()
-    
+
     def load_fire_images(self):
+        if FireTrap.images is None:
+            FireTrap.images = self.build_fire_images()
+        self.frames, self.fire_on, self.fire_off, self.fire_hit = FireTrap.images
+
+    def build_fire_images(self):
         """Load fire images from assets. Prefer a 32x32 spritesheet and split into frames using subsurface.
-        Fallback to single on/off/hit images if necessary."""
+        Fallback to single on/off/hit images if necessary. Returns (frames, on, off, hit)."""
         self.frames = []
         # Try to load a spritesheet of frames
         sheet_path = "assets/Traps/Fire/on.png"
@@ -199,6 +427,7 @@ class FireTrap(pg.sprite.Sprite):
             elif self.fire_on:
                 # duplicate single frame to keep indexing logic simple
                 self.frames = [self.fire_on]
+        return self.frames, self.fire_on, self.fire_off, self.fire_hit
     
     def draw(self, surface, world_x, reveal=False):
         self.rect.x = self.world_x - world_x
@@ -210,16 +439,14 @@ class FireTrap(pg.sprite.Sprite):
             elif self.always_visible or reveal:
                 # If frames are available from a spritesheet, animate by index
                 if self.frames:
-                    if not hasattr(self, 'anim_index'):
-                        self.anim_index = 0
                     # Slower animation: smaller increment advances frames less frequently
-                    self.anim_index += 0.08
+                    self.anim_index += 0.08 * FireTrap.anim_rate
                     idx = int(self.anim_index) % len(self.frames)
                     surface.blit(self.frames[idx], self.rect)
                 else:
                     # Alternate between on/off for simple animation
                     # Slower toggle between on/off images
-                    self.animation_frame += 0.04
+                    self.animation_frame += 0.04 * FireTrap.anim_rate
                     if self.fire_on:
                         if int(self.animation_frame) % 2 == 0:
                             surface.blit(self.fire_on, self.rect)
@@ -247,25 +474,46 @@ class FireTrap(pg.sprite.Sprite):
 
 # ========== HEALING ITEM CLASS 
 class HealingItem(pg.sprite.Sprite):
-    def __init__(self, x, y):
+    # Surfaces shared by every heal; loaded from disk by the first one (see load_heal_image)
+    images = None
+    # Pulse animation on/off for all heals (turned off by the QualityGovernor)
+    pulse = True
+
+    def __init__(self, x=0, y=0):
         super().__init__()
-        self.world_x = x
-        self.world_y = y
         self.size = 24
         self.rect = pg.Rect(0, 0, self.size, self.size)
+        self.load_heal_image()
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        """Reinitialise per-instance state so a pooled heal can be reused."""
+        self.world_x = x
+        self.world_y = y
         self.collected = False
         self.animation_frame = 0
-        self.load_heal_image()
-    
+
     def load_heal_image(self):
-        """Load health item from assets"""
+        if HealingItem.images is None:
+            HealingItem.images = self.build_heal_images()
+        self.heal_image, self.pulse_images = HealingItem.images
+
+    def build_heal_images(self):
+        """Load health item from assets. Returns (image, pulse_images)."""
+        self.pulse_images = []
         heart_path = "assets/heart.png"
         if os.path.exists(heart_path):
             self.heal_image = pg.image.load(heart_path).convert_alpha()
+            # Pre-scale both pulse sizes once instead of scaling every frame
+            for scale in (1.1, 1.0):
+                scaled = pg.transform.scale(self.heal_image, (int(self.size * scale), int(self.size * scale)))
+                offset = int(self.size * (scale - 1) / 2)
+                self.pulse_images.append((scaled, offset))
         else:
             # Fallback: no image, draw a green circle in draw()
             self.heal_image = None
-    
+        return self.heal_image, self.pulse_images
+
     def draw(self, surface, world_x):
         if self.collected:
             return
@@ -275,13 +523,13 @@ class HealingItem(pg.sprite.Sprite):
         
         if -50 <= self.rect.x <= SCREEN_WIDTH + 50:
             if self.heal_image:
-                # Pulsing animation
-                self.animation_frame += 0.05
-                scale = 1.0 + 0.1 * (0.5 + 0.5 * (1 if int(self.animation_frame) % 2 == 0 else -1))
-                scaled_img = pg.transform.scale(self.heal_image, 
-                                               (int(self.size * scale), int(self.size * scale)))
-                surface.blit(scaled_img, (self.rect.x - int(self.size * (scale - 1) / 2), 
-                                         self.rect.y - int(self.size * (scale - 1) / 2)))
+                # Pulsing animation (plain unscaled image when pulsing is shed)
+                if HealingItem.pulse:
+                    self.animation_frame += 0.05
+                    scaled_img, offset = self.pulse_images[int(self.animation_frame) % 2]
+                else:
+                    scaled_img, offset = self.pulse_images[1]
+                surface.blit(scaled_img, (self.rect.x - offset, self.rect.y - offset))
             else:
                 # Fallback: green circle
                 pg.draw.circle(surface, (0, 255, 0), 
@@ -309,9 +557,135 @@ class HealingItem(pg.sprite.Sprite):
         return False
 
 
+# ========== WORLD GENERATOR
+class WorldGenerator:
+    """Generates future platform groups and their hazards on a background thread.
+
+    Groups are plain data tuples (start_x, y, fires, heal) where fires is a list of
+    (x, y, always_visible) and heal is (x, y) or None. They are pushed into a bounded
+    queue `lookahead` groups ahead of the player; the main loop only dequeues and
+    integrates them (see Level.add_platform_group). The generator owns its own seeded
+    Random, so the sequence of groups depends only on the seed, not on frame timing."""
+    def __init__(self, seed, last_x, tile_w, group_fire_counts=(), prev_group_had_invisible=False, lookahead=8):
+        self.rng = random.Random(seed)
+        self.last_x = last_x
+        self.tile_w = tile_w
+        self.group_fire_counts = list(group_fire_counts[-2:])
+        self.prev_group_had_invisible = prev_group_had_invisible
+        self.queue = queue.Queue(maxsize=lookahead)
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="world-generator", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            group = self.generate_group()
+            while not self._stop.is_set():
+                try:
+                    self.queue.put(group, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def next_group(self):
+        """Dequeue the next group. Normally the queue is already full; if the worker has
+        died, generate inline so the game keeps going with the same sequence."""
+        while True:
+            try:
+                return self.queue.get(timeout=0.05)
+            except queue.Empty:
+                if not self.thread.is_alive():
+                    return self.generate_group()
+
+    def stop(self):
+        self._stop.set()
+        self.thread.join()
+
+    def generate_group(self):
+        """Create a new 4-block platform with good spacing, plus its fires and heal."""
+        start_x = self.last_x + 250  # Space between platforms
+        # Different base heights for jumping; then raise them by 5-80 px to add variation
+        base_y = self.rng.choice([220, 250, 280])
+        raise_amt = self.rng.randint(5, 80)
+        y = max(80, base_y - raise_amt)
+        self.last_x = start_x + 3 * self.tile_w
+        fires = self.generate_fires(start_x, y)
+        heal = self.generate_heal(start_x, y, fires)
+        return (start_x, y, fires, heal)
+
+    def generate_fires(self, start_x, y):
+        """Fires for a newly created platform group (max 2)."""
+        rng = self.rng
+        # increase chance of having a fire (appear a bit more)
+        num = rng.choices([0, 1, 2], weights=[30, 50, 20], k=1)[0]
+        # enforce no 3 consecutive empties
+        if len(self.group_fire_counts) >= 2 and self.group_fire_counts[-1] == 0 and self.group_fire_counts[-2] == 0 and num == 0:
+            num = rng.choices([1, 2], weights=[80, 20], k=1)[0]
+        # record (only the last two counts are ever consulted)
+        self.group_fire_counts = (self.group_fire_counts + [num])[-2:]
+        indices = list(range(4))
+        rng.shuffle(indices)
+
+        # Track whether this group contains any invisible fires
+        group_has_invisible = False
+
+        fires = []
+        for i in range(min(num, 2)):
+            idx = indices[i]
+            fx = start_x + idx * self.tile_w + (self.tile_w - 32) // 2
+            # sometimes place fire on ground instead of just above platform
+            if rng.random() < 0.18:
+                fy = GROUND_TOP - 32
+            else:
+                fy = y - 40
+            # Invisible fires should be rarer — roughly 1 every 3-5 groups
+            invisible_prob = 0.20
+            always_visible = rng.random() > invisible_prob
+            if not always_visible:
+                group_has_invisible = True
+            fires.append([fx, fy, always_visible])
+
+        # Avoid two consecutive groups being invisible-only (no consecutive 'black platforms')
+        if group_has_invisible and self.prev_group_had_invisible:
+            # ensure at least one visible fire in this group: flip the last invisible fire to visible
+            for f in reversed(fires):
+                if not f[2]:
+                    f[2] = True
+                    group_has_invisible = False
+                    break
+
+        self.prev_group_had_invisible = group_has_invisible
+        return [tuple(f) for f in fires]
+
+    def generate_heal(self, start_x, y, fires):
+        """Possibly a single heal for a new platform group (rare)."""
+        rng = self.rng
+        if rng.random() < 0.28:  # increased to ~28% chance
+            attempts = 4
+            for _ in range(attempts):
+                idx = rng.randrange(4)
+                hx = start_x + idx * self.tile_w + (self.tile_w - 24) // 2
+                hy = y - 60
+                # ensure sufficient gap from any fire on this group (>= 80 px);
+                # other groups are at least 250 px away so only this group's fires matter
+                too_close = False
+                for fx, fy, _visible in fires:
+                    if abs(fx - hx) < 80 and abs(fy - hy) < 80:
+                        too_close = True
+                        break
+                if not too_close:
+                    return (hx, hy)
+        return None
+
+
 # ===========LEVEL CLASS
 class Level:
-    def __init__(self):
+    def __init__(self, fire_pool=None, heal_pool=None, seed=None, level_path=None):
+        # All procedural choices come from a seeded Random so a seed reproduces the world
+        self.rng = random.Random(seed)
+        # Pools are owned by the caller so they survive Level rebuilds on reset
+        self.fire_pool = fire_pool if fire_pool is not None else Pool(FireTrap)
+        self.heal_pool = heal_pool if heal_pool is not None else Pool(HealingItem)
         bg_path = "assets/Background/Blue.png"
         if os.path.exists(bg_path):
             self.bg_tile = pg.image.load(bg_path).convert_alpha()
@@ -320,6 +694,7 @@ class Level:
             self.bg_tile = pg.Surface((200, 200))
             self.bg_tile.fill((50, 150, 255))
             self.bg_w, self.bg_h = 200, 200
+        self.bg_color = pg.transform.average_color(self.bg_tile)[:3]
 
         terrain_path = "assets/Terrain/Terrain.png"
         if os.path.exists(terrain_path):
@@ -342,24 +717,107 @@ class Level:
         self.tile_w = 48  # full block width
         self.tile_h = self.ground_tile.get_height()  # full block height (use actual asset height)
         
-        # Platform blocks - continuous generation
-        # store both block positions and platform group starts
-        self.platform_positions = []
+        # Platforms are stored as merged spans (world_x, y, w, h, surface): one collision
+        # rect and one pre-rendered blit per platform instead of one per 48px block
+        self.platforms = []
         self.platform_groups = []
+        self.walls = []  # (world_x, y, w, h) of wall spans, which also block from the side
+        self.span_surfaces = {}
+        # Reused screen-space rects, one per span (see get_platform_rects)
+        self.platform_rects = []
+        self.spare_rects = []
+        self.rects_created = 0
+        self.last_platform_x = 0
         self.group_fire_counts = []
         self.prev_group_had_invisible = False
-        self.generate_initial_platforms()
-        
-        # Fire traps (initially invisible)
         self.fire_traps = []
         self.last_fire_x = 0
-        self.generate_fire_traps()
-        
-        # Healing items
         self.heal_items = []
         self.last_heal_x = 0
-        self.generate_heal_items()
-    
+        # Every fire/heal ever spawned, in spawn order; an entity's uid is its index here. The
+        # live lists stay sorted by uid, and the removed sets hold the uids that were hit or
+        # collected, which (with the group count) is all a snapshot needs to rebuild them
+        self.fire_spawns = []
+        self.heal_spawns = []
+        self.removed_fires = set()
+        self.removed_heals = set()
+
+        self.add_left_wall()
+        if level_path:
+            # Handcrafted level; procedural generation continues after its last platform
+            self.load_map(level_path)
+        else:
+            self.generate_initial_platforms()
+            # Fire traps (initially invisible)
+            self.generate_fire_traps()
+            # Healing items
+            self.generate_heal_items()
+
+        # Groups taken from the generator, in order, and groups handed back by a rewind
+        # that must be re-integrated before asking the generator for more
+        self.integrated_groups = []
+        self.pending_groups = deque()
+        self.initial_last_platform_x = self.last_platform_x
+        # Future platform groups are produced ahead of time on a worker thread
+        self.generator = WorldGenerator(self.rng.getrandbits(64), self.last_platform_x, self.tile_w,
+                                        self.group_fire_counts, self.prev_group_had_invisible)
+
+    def get_span_surface(self, kind, w, h):
+        """Pre-render a span by tiling the ground (or rotated wall) tile once; cached by size
+        so every 4-block platform shares one surface."""
+        key = (kind, w, h)
+        surf = self.span_surfaces.get(key)
+        if surf is None:
+            tile = self.wall_tile if kind == "wall" else self.ground_tile
+            tw, th = tile.get_size()
+            # Tiles are clipped to the span, so the drawing matches the collision rect
+            surf = pg.Surface((w, h), pg.SRCALPHA)
+            for ty in range(0, h, th):
+                for tx in range(0, w, tw):
+                    surf.blit(tile, (tx, ty))
+            self.span_surfaces[key] = surf
+        return surf
+
+    def add_span(self, x, y, w, h, kind="ground"):
+        # Walls are only drawn down to the ground line; their collision rect may reach below it
+        draw_h = min(h, GROUND_TOP - y) if kind == "wall" else h
+        self.platforms.append((x, y, w, h, self.get_span_surface(kind, w, draw_h)))
+        if kind == "wall":
+            self.walls.append((x, y, w, h))
+        elif kind == "ground":
+            # Track the start of the right-most block; new groups are spaced from it
+            self.last_platform_x = max(self.last_platform_x, x + w - self.tile_w)
+
+    def block_walls(self, world_x, prev_world_x, player_rect):
+        """Undo horizontal scrolling into a wall: returns world_x moved back so the player
+        (fixed on screen, player_rect in screen space) ends up flush against the wall."""
+        if world_x == prev_world_x:
+            return world_x
+        for wx, wy, ww, wh in self.walls:
+            # Standing on top of a wall (or passing under it) is not a side contact
+            if player_rect.bottom <= wy or player_rect.top >= wy + wh:
+                continue
+            # Only a wall face crossed during this move blocks it
+            if world_x > prev_world_x:
+                if prev_world_x + player_rect.right <= wx < world_x + player_rect.right:
+                    world_x = wx - player_rect.right
+            elif prev_world_x + player_rect.left >= wx + ww > world_x + player_rect.left:
+                world_x = wx + ww - player_rect.left
+        return world_x
+
+    def add_platform(self, start_x, y, blocks=4):
+        """Add a platform of `blocks` side-by-side tiles as a single span."""
+        self.platform_groups.append((start_x, y))
+        self.add_span(start_x, y, blocks * self.tile_w, self.tile_h)
+
+    def add_left_wall(self):
+        """Add a left-side wall filling the whole column at x=0 so the player cannot move left past it"""
+        # Same extent as a column of stacked blocks: rotated-tile spacing, each block tile_h tall
+        wall_block_h = self.wall_tile.get_height()
+        blocks_high = (SCREEN_HEIGHT // wall_block_h) + 3
+        top = GROUND_TOP - wall_block_h * blocks_high
+        self.add_span(0, top, self.tile_w, wall_block_h * (blocks_high - 1) + self.tile_h, "wall")
+
     def generate_initial_platforms(self):
         """Generate initial platforms - each platform has 4 blocks side by side"""
         # Each platform is 4 blocks (48 pixels each = 192 pixels total)
@@ -371,48 +829,72 @@ class Level:
             (900, 250),   # Platform 4: Y=250 (middle)
             (1150, 280),  # Platform 5: Y=280 (lower)
         ]
-        
-        self.platform_positions = []
-        self.platform_groups = []
-        # Add a left-side wall filling the whole column at x=0 so the player cannot move left past it
-        wall_x = 0
-        # Use the rotated wall tile height for vertical spacing so blocks touch with no gaps
-        wall_block_h = self.wall_tile.get_height()
-        blocks_high = (SCREEN_HEIGHT // wall_block_h) + 3
-        # Build wall from bottom up so blocks stick together exactly using wall_tile height
-        for i in range(blocks_high):
-            wall_y = GROUND_TOP - wall_block_h * (i + 1)
-            self.platform_positions.append((wall_x, wall_y))
-
         for start_x, y in platform_groups:
-            # Record platform group start for spawning fires/heals
-            self.platform_groups.append((start_x, y))
-            # Add 4 blocks for each platform (tile_w pixels wide each, sticking together)
-            for i in range(4):
-                self.platform_positions.append((start_x + i * self.tile_w, y))
-    
+            self.add_platform(start_x, y)
+
+    def load_map(self, path):
+        """Load a handcrafted level from a tile map text file.
+
+        Each character is one cell tile_w px wide and MAP_ROW_H px tall; the last line sits
+        directly on the ground. '=' marks a platform top, '#' a wall (solid from the side as
+        well as from above), 'F' a fire, 'f' a hidden
+        fire and 'H' a heal; '.' or space is empty and lines starting with ';' are comments.
+        Horizontal runs of '=' and vertical runs of '#' are merged into single spans."""
+        with open(path) as f:
+            rows = [line.rstrip("\n") for line in f if not line.startswith(";")]
+        while rows and not rows[-1].strip():
+            rows.pop()
+        n = len(rows)
+
+        def cell_top(r):
+            return GROUND_TOP - (n - r) * MAP_ROW_H
+
+        for r, line in enumerate(rows):
+            c = 0
+            while c < len(line):
+                ch = line[c]
+                x = c * self.tile_w
+                bottom = cell_top(r) + MAP_ROW_H
+                if ch == "=":
+                    start = c
+                    while c < len(line) and line[c] == "=":
+                        c += 1
+                    self.add_platform(start * self.tile_w, cell_top(r), c - start)
+                    continue
+                if ch == "#" and (r == 0 or c >= len(rows[r - 1]) or rows[r - 1][c] != "#"):
+                    # Top of a wall column: extend down through the run of '#'
+                    end = r
+                    while end + 1 < n and c < len(rows[end + 1]) and rows[end + 1][c] == "#":
+                        end += 1
+                    self.add_span(x, cell_top(r), self.tile_w, (end - r + 1) * MAP_ROW_H, "wall")
+                elif ch in "Ff":
+                    self.spawn_fire(x + (self.tile_w - 32) // 2, bottom - 32, ch == "F")
+                elif ch == "H":
+                    self.spawn_heal(x + (self.tile_w - 24) // 2, bottom - 24)
+                c += 1
+
     def generate_fire_traps(self):
         """Generate initial fire traps for existing platform groups.
         Ensures at most 2 fires per platform group and positions them above the platform."""
         if not self.fire_traps:
             for gi, (start_x, y) in enumerate(self.platform_groups):
                 # Decide how many fires: bias toward fewer (0, 1, or 2)
-                num = random.choices([0, 1, 2], weights=[50, 40, 10], k=1)[0]
+                num = self.rng.choices([0, 1, 2], weights=[50, 40, 10], k=1)[0]
                 # If the previous two groups had zero fires, force at least one here
                 if len(self.group_fire_counts) >= 2 and self.group_fire_counts[-1] == 0 and self.group_fire_counts[-2] == 0 and num == 0:
-                    num = random.choices([1, 2], weights=[80, 20], k=1)[0]
+                    num = self.rng.choices([1, 2], weights=[80, 20], k=1)[0]
                 # record
                 self.group_fire_counts.append(num)
                 indices = list(range(4))
-                random.shuffle(indices)
+                self.rng.shuffle(indices)
                 for i in range(min(num, 2)):
                     idx = indices[i]
                     fx = start_x + idx * self.tile_w + (self.tile_w - 32) // 2
                     fy = y - 40  # above platform
                     # Bias toward visible fires; invisible fires rarer
                     invisible_prob = 0.18
-                    always_visible = random.random() > invisible_prob
-                    self.fire_traps.append(FireTrap(fx, fy, always_visible))
+                    always_visible = self.rng.random() > invisible_prob
+                    self.spawn_fire(fx, fy, always_visible)
 
     def update_fire_traps(self, world_x):
         # New fires are spawned when new platform groups are created (see Game.update_playing).
@@ -425,80 +907,121 @@ class Level:
         if not self.heal_items:
             for (start_x, y) in self.platform_groups:
                 # Increased probability to spawn a heal on this platform group
-                if random.random() < 0.28:  # ~28% chance
-                    idx = random.randrange(4)
+                if self.rng.random() < 0.28:  # ~28% chance
+                    idx = self.rng.randrange(4)
                     hx = start_x + idx * self.tile_w + (self.tile_w - 24) // 2
                     hy = y - 60
-                    self.heal_items.append(HealingItem(hx, hy))
+                    self.spawn_heal(hx, hy)
 
     def update_heal_items(self, world_x):
         # New heals are spawned when new platform groups are created (see Game.update_playing).
         return
 
-    def spawn_fires_for_group(self, start_x, y):
-        """Spawn fires for a newly created platform group (max 2)."""
-        # increase chance of having a fire (appear a bit more)
-        num = random.choices([0, 1, 2], weights=[30, 50, 20], k=1)[0]
-        # enforce no 3 consecutive empties
-        if len(self.group_fire_counts) >= 2 and self.group_fire_counts[-1] == 0 and self.group_fire_counts[-2] == 0 and num == 0:
-            num = random.choices([1, 2], weights=[80, 20], k=1)[0]
-        # record
-        self.group_fire_counts.append(num)
-        indices = list(range(4))
-        random.shuffle(indices)
+    def next_platform_group(self):
+        if self.pending_groups:
+            return self.pending_groups.popleft()
+        return self.generator.next_group()
 
-        # Track whether this group contains any invisible fires
-        group_has_invisible = False
+    def add_platform_group(self, group):
+        """Integrate a platform group produced by the WorldGenerator: add its 4-block span
+        and acquire pooled fires/heal for it."""
+        start_x, y, fires, heal = group
+        self.integrated_groups.append(group)
+        self.add_platform(start_x, y)
+        for fx, fy, always_visible in fires:
+            self.spawn_fire(fx, fy, always_visible)
+        if heal:
+            self.spawn_heal(heal[0], heal[1])
 
-        for i in range(min(num, 2)):
-            idx = indices[i]
-            fx = start_x + idx * self.tile_w + (self.tile_w - 32) // 2
-            # sometimes place fire on ground instead of just above platform
-            if random.random() < 0.18:
-                fy = GROUND_TOP - 32
+    def spawn_fire(self, x, y, always_visible):
+        fire = self.fire_pool.acquire(x, y, always_visible)
+        fire.uid = len(self.fire_spawns)
+        self.fire_spawns.append((x, y, always_visible))
+        self.fire_traps.append(fire)
+
+    def spawn_heal(self, x, y):
+        heal = self.heal_pool.acquire(x, y)
+        heal.uid = len(self.heal_spawns)
+        self.heal_spawns.append((x, y))
+        self.heal_items.append(heal)
+
+    def remove_fire(self, i):
+        """Take fire_traps[i] out of the world (it was hit) and hand it back to the pool."""
+        fire = self.fire_traps.pop(i)
+        self.removed_fires.add(fire.uid)
+        self.fire_pool.release(fire)
+
+    def remove_heal(self, i):
+        """Take heal_items[i] out of the world (it was collected) and hand it back to the pool."""
+        heal = self.heal_items.pop(i)
+        self.removed_heals.add(heal.uid)
+        self.heal_pool.release(heal)
+
+    def restore_entities(self, n_groups, removed_fires, removed_heals):
+        """Rebuild the fires and heals of a snapshot: the world is cut back (or grown) to
+        n_groups, then only the entities whose removed state differs are touched, so the cost
+        depends on how much changed rather than on how many entities exist."""
+        self.set_group_count(n_groups)
+        self.removed_fires = self._apply_removed(self.fire_traps, self.fire_pool, self.fire_spawns,
+                                                 self.removed_fires, set(removed_fires))
+        self.removed_heals = self._apply_removed(self.heal_items, self.heal_pool, self.heal_spawns,
+                                                 self.removed_heals, set(removed_heals))
+
+    @staticmethod
+    def _apply_removed(live, pool, spawns, removed, target):
+        uid = lambda entity: entity.uid
+        for i in removed - target:
+            # Removed now but present in the snapshot: spawn it again in its place
+            entity = pool.acquire(*spawns[i])
+            entity.uid = i
+            insort(live, entity, key=uid)
+        for i in target - removed:
+            pool.release(live.pop(bisect_left(live, i, key=uid)))
+        return target
+
+    def set_group_count(self, n):
+        """Make exactly n generated groups part of the world (used by snapshot restore).
+        Groups past n go back to the front of pending_groups, so the world ahead is rebuilt
+        identically, and their fires and heals are despawned."""
+        extra = len(self.integrated_groups) - n
+        if extra > 0:
+            dropped = self.integrated_groups[n:]
+            del self.fire_spawns[len(self.fire_spawns) - sum(len(g[2]) for g in dropped):]
+            del self.heal_spawns[len(self.heal_spawns) - sum(1 for g in dropped if g[3]):]
+            self._despawn_from(self.fire_traps, self.fire_pool, len(self.fire_spawns))
+            self._despawn_from(self.heal_items, self.heal_pool, len(self.heal_spawns))
+            self.removed_fires = {i for i in self.removed_fires if i < len(self.fire_spawns)}
+            self.removed_heals = {i for i in self.removed_heals if i < len(self.heal_spawns)}
+            self.pending_groups.extendleft(reversed(dropped))
+            del self.integrated_groups[n:]
+            del self.platform_groups[-extra:]
+            del self.platforms[-extra:]
+            # Keep the surplus rects for reuse when the world grows again
+            self.spare_rects.extend(self.platform_rects[len(self.platforms):])
+            del self.platform_rects[len(self.platforms):]
+            if self.integrated_groups:
+                self.last_platform_x = self.integrated_groups[-1][0] + 3 * self.tile_w
             else:
-                fy = y - 40
-            # Invisible fires should be rarer — roughly 1 every 3-5 groups
-            invisible_prob = 0.20
-            always_visible = random.random() > invisible_prob
-            if not always_visible:
-                group_has_invisible = True
-            self.fire_traps.append(FireTrap(fx, fy, always_visible))
+                self.last_platform_x = self.initial_last_platform_x
+        while len(self.integrated_groups) < n:
+            self.add_platform_group(self.next_platform_group())
 
-        # Avoid two consecutive groups being invisible-only (no consecutive 'black platforms')
-        if group_has_invisible and self.prev_group_had_invisible:
-            # ensure at least one visible fire in this group: flip the first fire to visible
-            for f in reversed(self.fire_traps[-min(num,2):]):
-                if not f.always_visible:
-                    f.always_visible = True
-                    group_has_invisible = False
-                    break
+    @staticmethod
+    def _despawn_from(live, pool, uid):
+        # Live lists are sorted by uid, so the newest entities are at the end
+        while live and live[-1].uid >= uid:
+            pool.release(live.pop())
 
-        self.prev_group_had_invisible = group_has_invisible
+    def close(self):
+        """Stop the world generator and return live entities to their pools."""
+        self.generator.stop()
+        self.release_entities()
 
-    def spawn_heal_for_group(self, start_x, y):
-        """Possibly spawn a single heal for a new platform group (rare)."""
-        if random.random() < 0.28:  # increased to ~28% chance
-            attempts = 4
-            chosen = None
-            for _ in range(attempts):
-                idx = random.randrange(4)
-                hx = start_x + idx * self.tile_w + (self.tile_w - 24) // 2
-                hy = y - 60
-                # ensure sufficient gap from any fire on this group (>= 80 px)
-                too_close = False
-                for f in self.fire_traps:
-                    # check world-x distance for fires near this group's range
-                    if abs(f.world_x - hx) < 80 and abs(f.world_y - hy) < 80:
-                        too_close = True
-                        break
-                if not too_close:
-                    chosen = (hx, hy)
-                    break
-            if chosen:
-                self.heal_items.append(HealingItem(chosen[0], chosen[1]))
-    
-    def draw_background(self, surface, world_x):
+    def draw_background(self, surface, world_x, tiled=True):
+        if not tiled:
+            # Reduced quality: a flat fill in the tile's average colour
+            surface.fill(self.bg_color)
+            return
         offset_x = -world_x % self.bg_w
         for i in range(-1, SCREEN_WIDTH // self.bg_w + 2):
             for j in range(-1, SCREEN_HEIGHT // self.bg_h + 2):
@@ -512,24 +1035,33 @@ class Level:
             surface.blit(self.ground_tile, rect)
     
     def get_platform_rects(self, world_x):
-        rects = []
-        for (px, py) in self.platform_positions:
-            # Convert world coordinates to screen coordinates so they match player's rect
-            screen_x = px - world_x
-            rect = pg.Rect(screen_x, py, self.tile_w, self.tile_h)
+        """Return screen-space rects for every platform span. The rects are reused across frames
+        and only moved in place; new ones are allocated only when platforms are added."""
+        rects = self.platform_rects
+        while len(rects) < len(self.platforms):
+            px, py, pw, ph, _ = self.platforms[len(rects)]
+            if self.spare_rects:
+                rect = self.spare_rects.pop()
+                rect.update(0, py, pw, ph)
+            else:
+                rect = pg.Rect(0, py, pw, ph)
+                self.rects_created += 1
             rects.append(rect)
+        for rect, plat in zip(rects, self.platforms):
+            # Convert world coordinates to screen coordinates so they match player's rect
+            rect.x = plat[0] - world_x
         return rects
+
+    def release_entities(self):
+        """Hand all live fires and heals back to their pools (used when the level is discarded)."""
+        self.fire_pool.release_all(self.fire_traps)
+        self.heal_pool.release_all(self.heal_items)
     
     def draw_platforms(self, surface, world_x):
-        for (px, py) in self.platform_positions:
+        for (px, py, pw, ph, surf) in self.platforms:
             screen_x = px - world_x
-            if px == 0:
-                # Left wall: draw rotated wall tile so it looks vertical
-                rect = self.wall_tile.get_rect(topleft=(screen_x, py))
-                surface.blit(self.wall_tile, rect)
-            else:
-                rect = self.ground_tile.get_rect(topleft=(screen_x, py))
-                surface.blit(self.ground_tile, rect)
+            if -surf.get_width() < screen_x < SCREEN_WIDTH:
+                surface.blit(surf, (screen_x, py))
     
     def draw_fire_traps(self, surface, world_x, reveal=False):
         for fire in self.fire_traps:
@@ -539,16 +1071,701 @@ class Level:
                 fire.draw(surface, world_x, reveal)
 
 
+# ========== PARTICLE SYSTEM
+class ParticleSystem:
+    """Dust, hit and confetti particles stored as columns rather than objects.
+
+    Each particle is one index into parallel x/y/vx/vy/age/life/kind columns in world
+    coordinates. With NumPy the update is a handful of vectorized operations and dead
+    particles are compacted to the front with a boolean mask; without it the same columns
+    are array.array and updated in a plain loop. Drawing is one Surface.blits call.
+    `capacity` is the hard budget: emit() drops whatever does not fit under `budget`."""
+    # kind: (sprite path, frame size, ticks per frame, lifetime, gravity, fallback colour)
+    KINDS = {
+        "dust": ("assets/Other/Dust Particle.png", 16, 6, 18, -0.05, (230, 230, 230)),
+        "hit": ("assets/Traps/Sand Mud Ice/Sand Particle.png", 16, 30, 28, 0.35, (255, 140, 40)),
+        "confetti": ("assets/Other/Confetti (16x16).png", 16, 5, 45, 0.15, (255, 80, 200)),
+    }
+
+    def __init__(self, capacity=5000, seed=None):
+        self.capacity = capacity
+        self.budget = capacity
+        self.count = 0
+        # Cosmetic only, so particles use their own RNG and never disturb the world seed
+        self.rng = random.Random(seed)
+        self.frames = []
+        self.kind_ids = {}
+        offsets, counts, ticks, lives, gravity = [], [], [], [], []
+        for kind, (path, size, frame_ticks, life, g, color) in self.KINDS.items():
+            self.kind_ids[kind] = len(offsets)
+            offsets.append(len(self.frames))
+            if os.path.exists(path):
+                sheet = pg.image.load(path).convert_alpha()
+                for fx in range(0, sheet.get_width() - size + 1, size):
+                    self.frames.append(sheet.subsurface((fx, 0, size, size)))
+            else:
+                surf = pg.Surface((4, 4))
+                surf.fill(color)
+                self.frames.append(surf)
+            counts.append(len(self.frames) - offsets[-1])
+            ticks.append(frame_ticks)
+            lives.append(life)
+            gravity.append(g)
+        self.kind_life = lives
+
+        if np is not None:
+            self.x = np.zeros(capacity, np.float32)
+            self.y = np.zeros(capacity, np.float32)
+            self.vx = np.zeros(capacity, np.float32)
+            self.vy = np.zeros(capacity, np.float32)
+            self.age = np.zeros(capacity, np.int32)
+            self.life = np.zeros(capacity, np.int32)
+            self.kind = np.zeros(capacity, np.int8)
+            self.kind_offset = np.array(offsets, np.int32)
+            self.kind_count = np.array(counts, np.int32)
+            self.kind_ticks = np.array(ticks, np.int32)
+            self.kind_gravity = np.array(gravity, np.float32)
+        else:
+            self.x = array("f", bytes(4 * capacity))
+            self.y = array("f", bytes(4 * capacity))
+            self.vx = array("f", bytes(4 * capacity))
+            self.vy = array("f", bytes(4 * capacity))
+            self.age = array("i", bytes(4 * capacity))
+            self.life = array("i", bytes(4 * capacity))
+            self.kind = array("b", bytes(capacity))
+            self.kind_offset = offsets
+            self.kind_count = counts
+            self.kind_ticks = ticks
+            self.kind_gravity = gravity
+
+    def emit(self, kind, x, y, count, speed=2.0, up=0.0):
+        """Spawn up to `count` particles of `kind` at world position (x, y) with random
+        directions; `up` adds an upward bias to the initial velocity."""
+        count = min(count, self.budget - self.count)
+        if count <= 0:
+            return
+        k = self.kind_ids[kind]
+        life = self.kind_life[k]
+        rand = self.rng.random
+        for i in range(self.count, self.count + count):
+            self.x[i] = x
+            self.y[i] = y
+            self.vx[i] = (rand() * 2 - 1) * speed
+            self.vy[i] = (rand() * 2 - 1) * speed - up
+            self.age[i] = 0
+            # Stagger lifetimes a little so a burst does not vanish on a single frame
+            self.life[i] = life - int(rand() * life * 0.3)
+            self.kind[i] = k
+        self.count += count
+
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        if np is not None:
+            x, y, vx, vy = self.x[:n], self.y[:n], self.vx[:n], self.vy[:n]
+            vy += self.kind_gravity[self.kind[:n]]
+            x += vx
+            y += vy
+            self.age[:n] += 1
+            alive = self.age[:n] < self.life[:n]
+            live = int(np.count_nonzero(alive))
+            if live < n:
+                # Compact survivors to the front of every column
+                for col in (self.x, self.y, self.vx, self.vy, self.age, self.life, self.kind):
+                    col[:live] = col[:n][alive]
+                self.count = live
+        else:
+            i = 0
+            while i < n:
+                self.age[i] += 1
+                if self.age[i] >= self.life[i]:
+                    # Swap-remove: move the last live particle into this slot
+                    n -= 1
+                    for col in (self.x, self.y, self.vx, self.vy, self.age, self.life, self.kind):
+                        col[i] = col[n]
+                    continue
+                self.vy[i] += self.kind_gravity[self.kind[i]]
+                self.x[i] += self.vx[i]
+                self.y[i] += self.vy[i]
+                i += 1
+            self.count = n
+
+    def draw(self, surface, world_x):
+        n = self.count
+        if not n:
+            return
+        frames = self.frames
+        if np is not None:
+            kind = self.kind[:n]
+            frame = self.kind_offset[kind] + (self.age[:n] // self.kind_ticks[kind]) % self.kind_count[kind]
+            xs = (self.x[:n] - world_x).astype(np.int32).tolist()
+            ys = self.y[:n].astype(np.int32).tolist()
+            surface.blits(zip(map(frames.__getitem__, frame.tolist()), zip(xs, ys)), doreturn=False)
+        else:
+            offset, count, ticks = self.kind_offset, self.kind_count, self.kind_ticks
+            surface.blits(
+                ((frames[offset[k] + (self.age[i] // ticks[k]) % count[k]], (int(self.x[i] - world_x), int(self.y[i])))
+                 for i, k in zip(range(n), self.kind)),
+                doreturn=False)
+
+    def clear(self):
+        self.count = 0
+
+
+# ========== RUN HISTORY
+class RunHistory:
+    """Local run history and leaderboard store (SQLite in WAL mode).
+
+    record() only enqueues the run; a writer thread drains the queue and inserts whatever
+    has accumulated in one transaction, so disk writes never stall a frame. WAL keeps
+    committed runs intact if the game crashes and lets the main thread read the
+    leaderboard while a batch is being written. top() is served by the score index."""
+    COLUMNS = ("finished_at", "score", "distance", "seed", "duration_s",
+               "frames", "avg_frame_ms", "max_frame_ms", "gc_pauses")
+
+    def __init__(self, path=RUN_DB_PATH, batch_size=64):
+        self.path = path
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        # Reader connection for the main thread; the writer opens its own
+        self.db = self._connect()
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "id INTEGER PRIMARY KEY, finished_at REAL, score INTEGER, distance INTEGER, seed INTEGER, "
+            "duration_s REAL, frames INTEGER, avg_frame_ms REAL, max_frame_ms REAL, gc_pauses INTEGER)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS runs_score ON runs (score DESC)")
+        self.db.commit()
+        self.thread = threading.Thread(target=self._writer, name="run-history", daemon=True)
+        self.thread.start()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        # NORMAL is crash-safe in WAL mode (only a power loss can drop the last commit)
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _writer(self):
+        db = self._connect()
+        sql = f"INSERT INTO runs ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})"
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                # Sentinel from close(): flush what came before it, then stop
+                batch = batch[:batch.index(None)]
+                running = False
+            if batch:
+                with db:
+                    db.executemany(sql, batch)
+        db.close()
+
+    def record(self, score, distance, seed, duration_s, perf_stats):
+        """Queue a finished run for writing; returns immediately."""
+        self.queue.put((time.time(), score, distance, seed, duration_s, perf_stats["frames"],
+                        perf_stats["avg_frame_ms"], perf_stats["max_frame_ms"], perf_stats["gc_pauses"]))
+
+    def top(self, n=10):
+        """Best n runs as (score, distance, duration_s, finished_at) tuples, highest score first."""
+        return self.db.execute(
+            "SELECT score, distance, duration_s, finished_at FROM runs ORDER BY score DESC LIMIT ?", (n,)).fetchall()
+
+    def close(self):
+        """Flush pending runs and close both connections."""
+        self.queue.put(None)
+        self.thread.join()
+        self.db.close()
+
+
+# ========== SNAPSHOTS
+# Versioned binary game state, little endian: one header, then the uids (uint32, ascending) of
+# the n_removed_fires fires and n_removed_heals heals that were hit or collected. Platforms,
+# fires and heals are not stored: they are regenerated from the seed and the number of
+# generated groups, so the size tracks what the player did, not how far the world reaches
+# (see Level.restore_entities). Fire and heal animation phases are cosmetic and not kept.
+# Bump the version when the layout changes.
+SNAPSHOT_MAGIC = b"TRSS"
+SNAPSHOT_VERSION = 2
+# magic, version, seed, state, world_x, score, distance, tab_revealed, tab_cooldown, tab_duration,
+# player x, y, vy, hp, jump_count, flags (on_ground | in_air << 1 | facing_right << 2), anim_index,
+# generated groups, n_removed_fires, n_removed_heals
+SNAPSHOT_HEADER = struct.Struct("<4sHQBiiiBHHiiibBBfIII")
+GAME_STATES = ("intro", "playing", "gameover", "leaderboard")
+
+
+# ========== GHOST RACING
+# Per-tick input bits exchanged between racers
+INPUT_RIGHT = 1
+INPUT_LEFT = 2
+INPUT_JUMP = 4
+INPUT_RESTART = 8
+INPUT_PLAYING = 16  # the runner was simulated this tick (not on the intro or game over screens)
+NET_PORT = 47800
+MAX_PREDICTION = 30  # ticks a ghost may run ahead of its confirmed input
+MAX_CATCHUP = 8  # ghost ticks simulated per frame when catching up
+KEYFRAME_TICKS = FPS  # how often a racer sends its full runner state for late joiners
+MAX_RACERS = 256  # player ids go on the wire as one byte
+
+# Wire format: every message is a 2-byte length followed by the payload; the first payload
+# byte is the message type.
+#   W  server -> client: player id, race seed, current race tick (one past the latest tick any racer
+#      has sent, so a late joiner counts the same ticks as everyone already running)
+#   I  client -> server: confirmed tick, n changes, n x (tick, input)  (delta compressed: only
+#      ticks where the input changed are listed, every other tick repeats the previous input)
+#   B  server -> client: n entries, each: player id + the body of that player's I message
+#   K  client -> server: tick, input at that tick and runner state after it (every KEYFRAME_TICKS)
+#   K  server -> client: player id + the body of that player's latest K, sent only to a client
+#      that just joined, followed by a B with that player's inputs since (see RelayServer._sync)
+#   L  server -> client: player id that left
+NET_FRAME = struct.Struct("<H")
+NET_WELCOME = struct.Struct("<cBQI")
+NET_INPUT = struct.Struct("<cIB")
+NET_CHANGE = struct.Struct("<IB")
+NET_BATCH = struct.Struct("<cB")
+NET_ENTRY = struct.Struct("<BIB")
+NET_LEAVE = struct.Struct("<cB")
+# world_x, y, vy, jump_count, flags (on_ground | in_air << 1 | facing_right << 2 | running << 3)
+NET_KEYFRAME = struct.Struct("<cIBiiiBB")
+NET_SYNC = struct.Struct("<cBIBiiiBB")
+
+
+def move_runner(player, world_x, mask, level):
+    """Apply one tick of horizontal input to a runner. Shared by the local player and ghosts
+    so both move identically. Returns (world_x, running, score change)."""
+    if mask & INPUT_JUMP:
+        player.jump()
+    running = False
+    prev_world_x = world_x
+    # Player movement - only scroll when player presses keys
+    if mask & INPUT_RIGHT:
+        world_x += WORLD_SCROLL_SPEED
+        player.facing_right = True
+        running = True
+    if mask & INPUT_LEFT:
+        if world_x > 0:
+            world_x -= WORLD_SCROLL_SPEED
+        # Make left movement animate as well (use flipped run frames)
+        player.facing_right = False
+        running = True
+    world_x = level.block_walls(world_x, prev_world_x, player.rect)
+    # Score follows the scroll: up when the world moved right, down when left
+    score = (world_x > prev_world_x) - (world_x < prev_world_x)
+    return world_x, running, score
+
+
+def runner_state(player, world_x):
+    """The state a ghost needs to continue a runner (see GhostRunner.set_state)."""
+    return (world_x, player.rect.y, player.vy, player.jump_count, player.on_ground,
+            player.in_air, player.facing_right, player.running)
+
+
+async def read_message(reader):
+    size, = NET_FRAME.unpack(await reader.readexactly(NET_FRAME.size))
+    return await reader.readexactly(size)
+
+
+def frame_message(payload):
+    return NET_FRAME.pack(len(payload)) + payload
+
+
+class RelayServer:
+    """Lockstep input relay for ghost racing.
+
+    Clients only send their own input deltas. Every tick the server sends each client a single
+    batch with everything the other clients sent since the previous tick, so traffic per client
+    is one message per tick regardless of how many racers there are. All racers get the same
+    seed and therefore the same world. Each racer's latest keyframe and the inputs since it are
+    kept so a client that joins mid-race can pick up everyone who is already running."""
+    def __init__(self, seed, tick_rate=FPS):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.clients = {}  # player id -> StreamWriter
+        self.pending = []  # batch entries (player id + input body) since the last flush
+        self.history = {}  # player id -> [latest keyframe entry or None, batch entries since it]
+        self.ticks = {}  # player id -> latest tick that racer has sent
+        self.port = None
+        self.loop = None
+        self.thread = None  # set by start_local_relay
+        self._stopped = None
+
+    def current_tick(self):
+        """The race tick a joining racer starts on. Racers count ticks by frames, not by the
+        wall clock, so this follows the racer furthest ahead."""
+        return max(self.ticks.values(), default=-1) + 1
+
+    async def serve(self, host="127.0.0.1", port=NET_PORT, started=None):
+        """Accept racers until close() is called."""
+        server = await asyncio.start_server(self._handle, host, port)
+        self.loop = asyncio.get_running_loop()
+        self.port = server.sockets[0].getsockname()[1]
+        self._stopped = asyncio.Event()
+        if started:
+            started.set()
+        async with server:
+            flusher = asyncio.ensure_future(self._flush_loop())
+            try:
+                await self._stopped.wait()
+            finally:
+                flusher.cancel()
+
+    def close(self):
+        """Disconnect every client and stop serving. Safe to call from any thread; waits for
+        the relay thread when it was started by start_local_relay."""
+        if self.loop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._stop)
+        if self.thread:
+            self.thread.join(5)
+
+    def _stop(self):
+        for writer in self.clients.values():
+            writer.close()
+        self._stopped.set()
+
+    async def _handle(self, reader, writer):
+        # Reuse the lowest free id; when all are taken the race is full
+        player_id = next((i for i in range(MAX_RACERS) if i not in self.clients), None)
+        if player_id is None:
+            writer.close()
+            return
+        try:
+            self.clients[player_id] = writer
+            self.history[player_id] = [None, []]
+            writer.write(frame_message(NET_WELCOME.pack(b"W", player_id, self.seed, self.current_tick())))
+            self._sync(writer)
+            while True:
+                payload = await read_message(reader)
+                if payload[:1] == b"I":
+                    entry = bytes((player_id,)) + payload[1:]
+                    self.pending.append(entry)
+                    self.history[player_id][1].append(entry)
+                    self.ticks[player_id] = NET_INPUT.unpack_from(payload)[1]
+                elif payload[:1] == b"K":
+                    self.history[player_id] = [bytes((player_id,)) + payload[1:], []]
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.pop(player_id, None)
+            self.history.pop(player_id, None)
+            self.ticks.pop(player_id, None)
+            # Unflushed input must not reach the others after they dropped this racer's ghost
+            self.pending = [e for e in self.pending if e[0] != player_id]
+            writer.close()
+            leave = frame_message(NET_LEAVE.pack(b"L", player_id))
+            for other in self.clients.values():
+                if not other.is_closing():
+                    other.write(leave)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(1 / self.tick_rate)
+            if not self.pending:
+                continue
+            entries, self.pending = self.pending, []
+            for player_id, writer in self.clients.items():
+                self._write_batch(writer, [e for e in entries if e[0] != player_id])
+
+    def _sync(self, writer):
+        """Catch a new client up on every racer already connected: their latest keyframe, then
+        every input since it. Without this a late joiner would only see inputs that changed
+        after it connected. Entries it gets again from the next flush are ignored by
+        GhostRunner.receive."""
+        for keyframe, entries in self.history.values():
+            if keyframe:
+                writer.write(frame_message(b"K" + keyframe))
+            self._write_batch(writer, entries)
+
+    @staticmethod
+    def _write_batch(writer, entries):
+        if writer.is_closing():
+            return  # disconnected; its handler is about to unregister it
+        # Entry count is one byte, so very large backlogs go out in several batches
+        for i in range(0, len(entries), 255):
+            chunk = entries[i:i + 255]
+            writer.write(frame_message(NET_BATCH.pack(b"B", len(chunk)) + b"".join(chunk)))
+
+
+def start_local_relay(seed, port=NET_PORT, host="127.0.0.1"):
+    """Run a RelayServer on a daemon thread (the local stand-in used by --host) and return it
+    once it is listening. Port 0 picks a free port (see server.port)."""
+    server = RelayServer(seed)
+    started = threading.Event()
+    thread = threading.Thread(target=lambda: asyncio.run(server.serve(host, port, started)),
+                              name="relay", daemon=True)
+    thread.start()
+    if not started.wait(5):
+        raise RuntimeError("relay server did not start")
+    server.thread = thread
+    return server
+
+
+class NetClient:
+    """Connection to a RelayServer, driven by an asyncio loop on a background thread.
+
+    The game thread calls send_input() once per tick and poll() once per frame; neither
+    blocks on the network."""
+    def __init__(self, host="127.0.0.1", port=NET_PORT, timeout=5):
+        self.inbox = queue.Queue()
+        self.last_mask = 0
+        self.connected = False
+        self.writer = None
+        self.read_task = None
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="net-client", daemon=True)
+        self.thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(self._connect(host, port), self.loop).result(timeout)
+        except BaseException:
+            self.close()
+            raise
+
+    async def _connect(self, host, port):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        _, self.player_id, self.seed, self.start_tick = NET_WELCOME.unpack(await read_message(self.reader))
+        self.connected = True
+        self.read_task = self.loop.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        try:
+            while True:
+                self.inbox.put(await read_message(self.reader))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self.connected = False
+
+    def send_input(self, tick, mask):
+        """Send this tick's input. Only changes are encoded; the tick number alone confirms
+        that every tick since the last change repeated the same input."""
+        if mask != self.last_mask:
+            payload = NET_INPUT.pack(b"I", tick, 1) + NET_CHANGE.pack(tick, mask)
+            self.last_mask = mask
+        else:
+            payload = NET_INPUT.pack(b"I", tick, 0)
+        if self.connected:
+            self.loop.call_soon_threadsafe(self.writer.write, frame_message(payload))
+
+    def send_keyframe(self, tick, mask, state):
+        """Send the runner state after `tick` (see runner_state). The relay only hands it to
+        racers who join later, so they can start this racer's ghost where it is."""
+        world_x, y, vy, jump_count, on_ground, in_air, facing_right, running = state
+        flags = on_ground | in_air << 1 | facing_right << 2 | running << 3
+        payload = NET_KEYFRAME.pack(b"K", tick, mask, world_x, y, vy, jump_count, flags)
+        if self.connected:
+            self.loop.call_soon_threadsafe(self.writer.write, frame_message(payload))
+
+    def poll(self):
+        """Decode everything received since the last call into
+        ("input", player_id, confirmed_tick, changes), ("keyframe", player_id, tick, mask, state)
+        and ("leave", player_id) events."""
+        events = []
+        while True:
+            try:
+                payload = self.inbox.get_nowait()
+            except queue.Empty:
+                return events
+            if payload[:1] == b"L":
+                events.append(("leave", NET_LEAVE.unpack(payload)[1]))
+                continue
+            if payload[:1] == b"K":
+                _, player_id, tick, mask, world_x, y, vy, jump_count, flags = NET_SYNC.unpack(payload)
+                state = (world_x, y, vy, jump_count, bool(flags & 1), bool(flags & 2),
+                         bool(flags & 4), bool(flags & 8))
+                events.append(("keyframe", player_id, tick, mask, state))
+                continue
+            _, count = NET_BATCH.unpack_from(payload)
+            offset = NET_BATCH.size
+            for _ in range(count):
+                player_id, confirmed, n_changes = NET_ENTRY.unpack_from(payload, offset)
+                offset += NET_ENTRY.size
+                changes = [NET_CHANGE.unpack_from(payload, offset + i * NET_CHANGE.size) for i in range(n_changes)]
+                offset += n_changes * NET_CHANGE.size
+                events.append(("input", player_id, confirmed, changes))
+
+    async def _shutdown(self):
+        if self.read_task:
+            self.read_task.cancel()
+            await asyncio.gather(self.read_task, return_exceptions=True)
+        if self.writer:
+            self.writer.close()
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+class GhostRunner:
+    """Another racer, simulated locally from their inputs in the same seeded world.
+
+    Ghosts only run, jump and land; fires and heals do not affect them. Inputs arrive delta
+    compressed and are expanded into one byte per tick. When a ghost's input for a tick is not
+    known yet it is predicted (last known input repeats) for at most MAX_PREDICTION ticks;
+    the state before each predicted tick is kept, and when the real input for that tick turns
+    out different the ghost rolls back to it and re-simulates.
+
+    A ghost starts at the first race tick it hears about: `tick` is the first tick to simulate,
+    `mask` the input in effect just before it and `state` the runner state there (from a
+    keyframe; None means a fresh runner at the start). Inputs already simulated are dropped, so
+    memory does not grow with the length of the race."""
+    def __init__(self, player_id, start_x, tick=0, mask=0, state=None):
+        self.player_id = player_id
+        self.start_x = start_x
+        self.body = Player(start_x, GROUND_TOP)  # shares Player.frame_sets, so ghosts are cheap
+        self.world_x = 0
+        if state:
+            self.set_state(state)
+        self.inputs = bytearray()  # confirmed input per tick, from base_tick on
+        self.base_tick = tick
+        self.mask = mask  # last confirmed input
+        self.tick = tick  # next tick to simulate
+        self.predicted = deque()  # (tick, input used, state before the tick)
+        self.rollbacks = 0
+
+    def confirmed_end(self):
+        """First tick whose input has not arrived yet."""
+        return self.base_tick + len(self.inputs)
+
+    def receive(self, confirmed, changes):
+        """Expand a delta message: every tick up to `confirmed` repeats the previous input
+        unless it is listed in `changes`. Ticks already known are ignored."""
+        mask = self.mask
+        changes = dict(changes)
+        for tick in range(self.confirmed_end(), confirmed + 1):
+            mask = changes.get(tick, mask)
+            self.inputs.append(mask)
+        self.mask = mask
+        # Check predictions that are now confirmed; roll back to the first wrong one
+        end = self.confirmed_end()
+        while self.predicted and self.predicted[0][0] < end:
+            tick, used, state = self.predicted.popleft()
+            if self.inputs[tick - self.base_tick] != used:
+                self.set_state(state)
+                self.tick = tick
+                self.predicted.clear()
+                self.rollbacks += 1
+
+    def get_state(self):
+        return runner_state(self.body, self.world_x)
+
+    def set_state(self, state):
+        body = self.body
+        (self.world_x, body.rect.y, body.vy, body.jump_count, body.on_ground,
+         body.in_air, body.facing_right, body.running) = state
+
+    def advance(self, target_tick, level):
+        """Simulate towards the local tick, predicting inputs not received yet."""
+        steps = 0
+        end = self.confirmed_end()
+        while self.tick < target_tick and steps < MAX_CATCHUP:
+            tick = self.tick
+            if tick < end:
+                mask = self.inputs[tick - self.base_tick]
+            else:
+                if tick - end >= MAX_PREDICTION:
+                    break  # lockstep: wait for this racer's input to arrive
+                # Predict: held keys and the playing state continue, one-shot inputs do not repeat
+                mask = self.mask & (INPUT_RIGHT | INPUT_LEFT | INPUT_PLAYING)
+                self.predicted.append((tick, mask, self.get_state()))
+            self.step(mask, level)
+            self.tick += 1
+            steps += 1
+        # Confirmed inputs before the current tick are never read again (rollbacks only go
+        # back to predicted ticks)
+        done = min(self.tick, end) - self.base_tick
+        if done > FPS:
+            del self.inputs[:done]
+            self.base_tick += done
+
+    def step(self, mask, level):
+        """One tick of the racer, the way Game runs it: a restart is a fresh runner, and the
+        runner only moves on ticks Game.update_playing ran."""
+        if mask & INPUT_RESTART:
+            self.body = Player(self.start_x, GROUND_TOP)
+            self.world_x = 0
+        if not mask & INPUT_PLAYING:
+            return
+        body = self.body
+        self.world_x, running, _ = move_runner(body, self.world_x, mask, level)
+        # The ghost may be ahead of the local player, so it can need the world built further out
+        while level.last_platform_x < self.world_x + SCREEN_WIDTH + 500:
+            level.add_platform_group(level.next_platform_group())
+        body.update(level.get_platform_rects(self.world_x), running)
+
+    def draw(self, surface, world_x):
+        offset_x = self.world_x - world_x
+        if -SCREEN_WIDTH < offset_x < SCREEN_WIDTH:
+            self.body.draw(surface, ghost=True, offset_x=offset_x)
+
+
+def apply_net_events(ghosts, events, start_x):
+    """Create, feed and drop ghosts (player id -> GhostRunner) from NetClient.poll() events."""
+    for event in events:
+        if event[0] == "leave":
+            ghosts.pop(event[1], None)
+            continue
+        if event[0] == "keyframe":
+            # A racer who was already running when we joined: continue from their keyframe
+            _, player_id, tick, mask, state = event
+            ghosts[player_id] = GhostRunner(player_id, start_x, tick + 1, mask, state)
+            continue
+        _, player_id, confirmed, changes = event
+        ghost = ghosts.get(player_id)
+        if ghost is None:
+            # No keyframe, so this is the racer's first input: they start from scratch
+            first_tick = min([confirmed] + [tick for tick, _ in changes])
+            ghost = ghosts[player_id] = GhostRunner(player_id, start_x, first_tick)
+        ghost.receive(confirmed, changes)
+
+
 # ========== GAME CLASS
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None, level_path=None, net=None):
         self.screen = pg.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pg.display.set_caption("Time Runner")
         self.clock = pg.time.Clock()
         self.font_big = pg.font.SysFont(None, 60)
         self.font_small = pg.font.SysFont(None, 28)
-        
-        self.level = Level()
+
+        # Entity pools live on the Game so reset() can recycle the old level's objects
+        self.fire_pool = Pool(FireTrap)
+        self.heal_pool = Pool(HealingItem)
+        self.fire_pool.prewarm(FIRE_POOL_PREWARM)
+        self.heal_pool.prewarm(HEAL_POOL_PREWARM)
+        self.perf = PerfMonitor()
+        try:
+            self.history = RunHistory()
+        except sqlite3.DatabaseError:
+            # e.g. a read-only working directory on a kiosk: play on without a run history
+            self.history = None
+        self.leaderboard_lines = []
+        self.particles = ParticleSystem()
+        self.governor = QualityGovernor(self.perf)
+        self.rewind_buffer = deque(maxlen=REWIND_FRAMES)
+        self.checkpoint = None
+        icon_path = "assets/Menu/Buttons/Leaderboard.png"
+        if os.path.exists(icon_path):
+            self.leaderboard_icon = pg.transform.scale2x(pg.image.load(icon_path).convert_alpha())
+        else:
+            self.leaderboard_icon = None
+
+        # Ghost racing: everyone connected to the relay plays the relay's seed
+        self.net = net
+        self.ghosts = {}
+        if net:
+            seed = net.seed
+            self.net_tick = net.start_tick
+        self.jump_pressed = False
+        self.tick_input = 0
+        self.restart_pending = False
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        # Optional handcrafted tile map (see Level.load_map); None means fully procedural
+        self.level_path = level_path
+        self.level = Level(self.fire_pool, self.heal_pool, self.seed, self.level_path)
         # Place player just right of the left wall (wall is at x=0, tile_w wide)
         start_x = self.level.tile_w + 10
         self.player = Player(start_x, GROUND_TOP)
@@ -558,6 +1775,8 @@ class Game:
         self.state = "intro"
         self.running = True
         self.score = 0
+        self.distance = 0  # furthest world_x reached this run
+        self.run_start = 0.0
         self.tab_revealed = False
         self.tab_cooldown = 0
         self.tab_duration = 0  # duration in frames (set when used)
@@ -566,14 +1785,113 @@ class Game:
         self._grayscale_dirty = True
     
     def reset(self):
-        self.level = Level()
+        self.level.close()
+        # Each new run gets a fresh world, except in a ghost race where the world is shared
+        if self.net:
+            self.restart_pending = True
+        else:
+            self.seed = random.randrange(2 ** 32)
+        self.level = Level(self.fire_pool, self.heal_pool, self.seed, self.level_path)
         start_x = self.level.tile_w + 10
         self.player = Player(start_x, GROUND_TOP)
         self.world_x = 0
         self.state = "intro"
         self.score = 0
+        self.distance = 0
         self.tab_revealed = False
         self.tab_cooldown = 0
+        self.particles.clear()
+        self.rewind_buffer.clear()
+        self.checkpoint = None
+        self.jump_pressed = False
+
+    def start_run(self):
+        self.state = "playing"
+        self.run_start = time.perf_counter()
+        self.perf.start_run()
+
+    def game_over(self):
+        """Switch to the game over screen and queue the finished run for the history store."""
+        if self.state == "gameover":
+            return
+        self.state = "gameover"
+        if self.history:
+            self.history.record(self.score, self.distance, self.seed,
+                                time.perf_counter() - self.run_start, self.perf.run_stats())
+
+    def snapshot(self):
+        """Serialize the full game state to a compact bytes blob (see SNAPSHOT_HEADER)."""
+        level = self.level
+        player = self.player
+        removed = sorted(level.removed_fires)
+        n_removed_fires = len(removed)
+        removed += sorted(level.removed_heals)
+        header = SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self.seed, GAME_STATES.index(self.state),
+            self.world_x, self.score, self.distance, self.tab_revealed, self.tab_cooldown, self.tab_duration,
+            player.rect.x, player.rect.y, player.vy, player.hp, player.jump_count,
+            player.on_ground | player.in_air << 1 | player.facing_right << 2, player.anim_index,
+            len(level.integrated_groups), n_removed_fires, len(removed) - n_removed_fires)
+        return header + struct.pack(f"<{len(removed)}I", *removed)
+
+    def restore(self, data):
+        """Load a blob produced by snapshot(). A snapshot from another seed rebuilds the level."""
+        (magic, version, seed, state, world_x, score, distance, tab_revealed, tab_cooldown, tab_duration,
+         px, py, vy, hp, jump_count, flags, anim_index,
+         n_groups, n_removed_fires, n_removed_heals) = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot (magic {magic!r}, version {version})")
+        if seed != self.seed:
+            self.level.close()
+            self.seed = seed
+            self.level = Level(self.fire_pool, self.heal_pool, self.seed, self.level_path)
+        removed = struct.unpack_from(f"<{n_removed_fires + n_removed_heals}I", data, SNAPSHOT_HEADER.size)
+        self.level.restore_entities(n_groups, removed[:n_removed_fires], removed[n_removed_fires:])
+
+        player = self.player
+        player.rect.x = px
+        player.rect.y = py
+        player.vy = vy
+        player.hp = hp
+        player.jump_count = jump_count
+        player.on_ground = bool(flags & 1)
+        player.in_air = bool(flags & 2)
+        player.facing_right = bool(flags & 4)
+        player.anim_index = anim_index
+
+        self.state = GAME_STATES[state]
+        self.world_x = world_x
+        self.score = score
+        self.distance = distance
+        self.tab_revealed = bool(tab_revealed)
+        self.tab_cooldown = tab_cooldown
+        self.tab_duration = tab_duration
+
+    def update_net(self):
+        """Send this tick's input to the relay, apply what other racers sent and advance their
+        ghosts. Runs every frame in every state so all racers' ticks stay aligned."""
+        mask = self.tick_input
+        if self.restart_pending:
+            mask |= INPUT_RESTART
+            self.restart_pending = False
+        self.net.send_input(self.net_tick, mask)
+        if self.net_tick % KEYFRAME_TICKS == 0:
+            self.net.send_keyframe(self.net_tick, mask, runner_state(self.player, self.world_x))
+        self.net_tick += 1
+        apply_net_events(self.ghosts, self.net.poll(), self.level.tile_w + 10)
+        for ghost in self.ghosts.values():
+            ghost.advance(self.net_tick, self.level)
+
+    def open_leaderboard(self):
+        """Query the top runs once and pre-render their rows; the screen then just blits them."""
+        self.state = "leaderboard"
+        self.leaderboard_lines = []
+        if not self.history:
+            return
+        for rank, (score, distance, duration_s, finished_at) in enumerate(self.history.top(10), 1):
+            cells = (f"{rank}.", str(score), f"{distance // 10} m", f"{int(duration_s)} s",
+                     time.strftime("%Y-%m-%d", time.localtime(finished_at)))
+            self.leaderboard_lines.append([self.font_small.render(c, True, (230, 230, 230)) for c in cells])
     
     def handle_events(self):
         for event in pg.event.get():
@@ -583,14 +1901,25 @@ class Game:
             if event.type == pg.KEYDOWN:
                 if event.key == pg.K_ESCAPE:
                     self.running = False
+
+                # F3 toggles the perf overlay (frame time, allocations, GC pauses)
+                if event.key == pg.K_F3:
+                    self.perf.show = not self.perf.show
                 
                 if self.state == "intro":
                     if event.key == pg.K_SPACE:
-                        self.state = "playing"
+                        self.start_run()
+                    elif event.key == pg.K_l:
+                        self.open_leaderboard()
+
+                elif self.state == "leaderboard":
+                    if event.key in (pg.K_l, pg.K_SPACE, pg.K_BACKSPACE):
+                        self.state = "intro"
                 
                 elif self.state == "playing":
                     if event.key in (pg.K_SPACE, pg.K_UP):
-                        self.player.jump()
+                        # Applied on the next tick so it is part of that tick's input
+                        self.jump_pressed = True
                     
                     # TAB to reveal fire (always available, cooldown after use)
                     if event.key == pg.K_TAB:
@@ -602,47 +1931,41 @@ class Game:
                             # cooldown will start after reveal ends (set later)
                             # mark grayscale cache dirty so it will be recomputed (or re-applied)
                             self._grayscale_dirty = True
+
+                    # F5 stores a checkpoint, F9 jumps back to it (not in a ghost race: inputs already sent)
+                    if event.key == pg.K_F5 and not self.net:
+                        self.checkpoint = self.snapshot()
+                    elif event.key == pg.K_F9 and self.checkpoint and not self.net:
+                        self.restore(self.checkpoint)
                 
                 elif self.state == "gameover":
                     if event.key == pg.K_r:
                         self.reset()
     
-    def update_playing(self):
+    def read_input(self):
+        """This tick's input bits (INPUT_*) from the keyboard and any jump key press."""
         keys = pg.key.get_pressed()
-        running = False
-        
-        # Player movement - only scroll when player presses keys
+        mask = 0
         if keys[pg.K_RIGHT]:
-            self.world_x += WORLD_SCROLL_SPEED
-            self.player.facing_right = True
-            running = True
-            self.score += 1  # Score increases as world scrolls
+            mask |= INPUT_RIGHT
         if keys[pg.K_LEFT]:
-            if self.world_x > 0:
-                self.world_x -= WORLD_SCROLL_SPEED
-                # Decrease score when running left (do not go below 0)
-                self.score = max(0, self.score - 1)
-            # Make left movement animate as well (use flipped run frames)
-            self.player.facing_right = False
-            running = True
+            mask |= INPUT_LEFT
+        if self.jump_pressed:
+            mask |= INPUT_JUMP
+            self.jump_pressed = False
+        return mask
+
+    def update_playing(self):
+        mask = self.read_input()
+        self.tick_input = mask | INPUT_PLAYING
+        self.world_x, running, score = move_runner(self.player, self.world_x, mask, self.level)
+        # Score never goes below 0
+        self.score = max(0, self.score + score)
+        self.distance = max(self.distance, self.world_x)
         
-        # Generate new platforms ahead - each platform has 4 blocks
-        if self.level.platform_positions:
-            last_x = max([p[0] for p in self.level.platform_positions])
-            if last_x < self.world_x + SCREEN_WIDTH + 500:
-                # Create a new 4-block platform with good spacing
-                platform_start_x = last_x + 250  # Space between platforms
-                # Different base heights for jumping; then raise them by 5-80 px to add variation
-                base_y = random.choice([220, 250, 280])
-                raise_amt = random.randint(5, 80)
-                platform_y = max(80, base_y - raise_amt)
-                # Record the new platform group
-                self.level.platform_groups.append((platform_start_x, platform_y))
-                for i in range(4):
-                    self.level.platform_positions.append((platform_start_x + i * self.level.tile_w, platform_y))
-                # Spawn fires and possible heal for this new group
-                self.level.spawn_fires_for_group(platform_start_x, platform_y)
-                self.level.spawn_heal_for_group(platform_start_x, platform_y)
+        # Bring in the next pre-generated platform group (built ahead on the generator thread)
+        if self.level.last_platform_x < self.world_x + SCREEN_WIDTH + 500:
+            self.level.add_platform_group(self.level.next_platform_group())
         
         # Generate new fire traps
         self.level.update_fire_traps(self.world_x)
@@ -652,6 +1975,8 @@ class Game:
         
         # Update player
         self.player.update(platform_rects, running)
+        if self.player.just_landed:
+            self.particles.emit("dust", self.player.rect.centerx + self.world_x, self.player.rect.bottom - 8, 6, 1.0, 0.5)
         
         # Update fire traps
         self.level.update_fire_traps(self.world_x)
@@ -670,38 +1995,37 @@ class Game:
         if self.tab_cooldown > 0:
             self.tab_cooldown -= 1
         
-        # Check fire collision
-        fire_to_remove = []
-        for i, fire in enumerate(self.level.fire_traps):
+        # Check fire collision; iterate backwards so finished fires can be removed in place
+        # and handed back to the pool without building a removal list every frame
+        fires = self.level.fire_traps
+        for i in range(len(fires) - 1, -1, -1):
+            fire = fires[i]
             if fire.check_collision(self.player.rect, self.tab_revealed, self.world_x):
                 fire.hit()  # Show hit animation
+                self.particles.emit("hit", fire.world_x + 8, fire.world_y + 8, 14, 3.0, 3.0)
                 self.player.hp -= 1
-                fire_to_remove.append(i)
+                self.level.remove_fire(i)
                 if self.player.hp <= 0:
-                    self.state = "gameover"
+                    self.game_over()
             elif fire.is_hit:
                 fire.hit_timer -= 1
                 if fire.hit_timer <= 0:
-                    fire_to_remove.append(i)
+                    self.level.remove_fire(i)
         
-        # Remove fires after hit animation (reverse order)
-        for i in reversed(fire_to_remove):
-            self.level.fire_traps.pop(i)
-        
-        # Check healing item collision
-        heal_to_remove = []
-        for i, heal in enumerate(self.level.heal_items):
+        # Check healing item collision, releasing collected heals to the pool
+        heals = self.level.heal_items
+        for i in range(len(heals) - 1, -1, -1):
+            heal = heals[i]
             if not heal.collected and heal.check_collision_world(self.player.rect, self.world_x):
                 self.player.hp = min(3, self.player.hp + 1)  # Restore 1 HP, max 3
-                heal_to_remove.append(i)
-        
-        # Remove collected heals
-        for i in reversed(heal_to_remove):
-            self.level.heal_items.pop(i)
+                self.particles.emit("confetti", heal.world_x + 4, heal.world_y + 4, 24, 2.5, 2.5)
+                self.level.remove_heal(i)
         
+        self.particles.update()
+
         # Fall off screen = game over
         if self.player.rect.y > SCREEN_HEIGHT:
-            self.state = "gameover"
+            self.game_over()
     
     def draw_intro(self):
         self.screen.fill((20, 20, 40))
@@ -709,12 +2033,38 @@ class Game:
         title = self.font_big.render("Time RUNNER", True, (255, 100, 0))
         info = self.font_small.render("Press SPACE to start", True, (200, 200, 200))
         controls = self.font_small.render("Arrow Keys: Move | SPACE: Jump | TAB: Reveal Fire", True, (180, 180, 180))
+        board = self.font_small.render("L: Leaderboard", True, (150, 150, 150))
         info2 = self.font_small.render("TAB reveal: 15s  |  cooldown: 20s after use", True, (150, 200, 255))
+        time_controls = self.font_small.render("BACKSPACE (hold): Rewind | F5: Checkpoint | F9: Load", True, (180, 180, 180))
         
         self.screen.blit(title, title.get_rect(center=(SCREEN_WIDTH // 2, 100)))
         self.screen.blit(controls, controls.get_rect(center=(SCREEN_WIDTH // 2, 180)))
         self.screen.blit(info2, info2.get_rect(center=(SCREEN_WIDTH // 2, 220)))
+        self.screen.blit(time_controls, time_controls.get_rect(center=(SCREEN_WIDTH // 2, 255)))
         self.screen.blit(info, info.get_rect(center=(SCREEN_WIDTH // 2, 300)))
+        self.screen.blit(board, board.get_rect(center=(SCREEN_WIDTH // 2, 340)))
+
+    def draw_leaderboard(self):
+        self.screen.fill((20, 20, 40))
+        title = self.font_big.render("LEADERBOARD", True, (255, 100, 0))
+        title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 50))
+        self.screen.blit(title, title_rect)
+        if self.leaderboard_icon:
+            self.screen.blit(self.leaderboard_icon, self.leaderboard_icon.get_rect(midright=(title_rect.left - 12, title_rect.centery)))
+
+        if self.leaderboard_lines:
+            # Right-align each column at a fixed x so the table lines up with a proportional font
+            column_right = (190, 310, 430, 530, 680)
+            for i, cells in enumerate(self.leaderboard_lines):
+                for cell, right in zip(cells, column_right):
+                    self.screen.blit(cell, cell.get_rect(topright=(right, 95 + i * 26)))
+        else:
+            message = "No runs yet" if self.history else "Run history unavailable"
+            empty = self.font_small.render(message, True, (200, 200, 200))
+            self.screen.blit(empty, empty.get_rect(center=(SCREEN_WIDTH // 2, 180)))
+
+        info = self.font_small.render("Press L to go back", True, (150, 150, 150))
+        self.screen.blit(info, info.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 25)))
     
     def draw_hud(self):
         # HUD color / position settings
@@ -754,13 +2104,53 @@ class Game:
         score_text = self.font_small.render(f"Score: {self.score}", True, hp_text_color)
         self.screen.blit(score_text, (SCREEN_WIDTH - 140, 10))
 
+        # Ghost race: number of racers including us
+        if self.net:
+            racers_text = self.font_small.render(f"Racers: {len(self.ghosts) + 1}", True, hp_text_color)
+            self.screen.blit(racers_text, (SCREEN_WIDTH - 250, 80))
+
         # Reveal indicator
         if self.tab_revealed:
             reveal_text = self.font_small.render("FIRE REVEALED!", True, (255, 100, 0))
             self.screen.blit(reveal_text, (SCREEN_WIDTH // 2 - 100, 10))
     
+    def apply_quality(self):
+        """Push the governor's current settings to the systems that read them."""
+        q = self.governor.settings
+        HealingItem.pulse = q["heart_pulse"]
+        FireTrap.anim_rate = q["fire_anim_rate"]
+        self.particles.budget = int(self.particles.capacity * q["particles"])
+
+    def get_grayscale_overlay(self):
+        """Return the desaturating multiply overlay, building it only when marked dirty."""
+        if self._grayscale_cache is None or self._grayscale_dirty:
+            if self._grayscale_cache is None:
+                self._grayscale_cache = pg.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert_alpha()
+            self._grayscale_cache.fill((120, 120, 120))
+            self._grayscale_dirty = False
+        return self._grayscale_cache
+
+    def draw_perf(self):
+        perf = self.perf
+        lines = [
+            f"frame: {perf.frame_ms:.2f} ms  allocs: {perf.frame_allocs}",
+            f"gc: {perf.gc_pauses} pauses  max {perf.gc_pause_max_ms:.2f} ms",
+            f"pool fire {self.fire_pool.created}/{self.fire_pool.reused}  heal {self.heal_pool.created}/{self.heal_pool.reused}",
+            f"particles: {self.particles.count}/{self.particles.budget}",
+        ]
+        governor = perf.governor
+        if governor:
+            lines.append(f"quality: {governor.settings['name']}  avg {governor.ema_ms:.2f} ms  ({len(governor.history)} changes)")
+            # Most recent decisions, oldest first
+            for frame, old, new, ema_ms in list(governor.history)[-3:]:
+                lines.append(f"  frame {frame}: {QUALITY_LEVELS[old]['name']} -> {QUALITY_LEVELS[new]['name']} at {ema_ms} ms")
+        top = SCREEN_HEIGHT - 18 - len(lines) * 24
+        for i, line in enumerate(lines):
+            text = self.font_small.render(line, True, (255, 255, 0))
+            self.screen.blit(text, (50, top + i * 24))
+
     def draw_playing(self):
-        self.level.draw_background(self.screen, self.world_x)
+        self.level.draw_background(self.screen, self.world_x, self.governor.settings["background"])
         self.level.draw_ground(self.screen, self.world_x)
         self.level.draw_platforms(self.screen, self.world_x)
         # Draw only visible fires initially; invisible fires will be drawn colored when TAB is active
@@ -771,18 +2161,20 @@ class Game:
             if not heal_item.collected:
                 heal_item.draw(self.screen, self.world_x)
 
+        for ghost in self.ghosts.values():
+            ghost.draw(self.screen, self.world_x)
         self.player.draw(self.screen)
+        self.particles.draw(self.screen, self.world_x)
 
         self.draw_hud()
 
         # If TAB reveal active: apply a fast grayscale-like overlay, then draw invisible fires colored on top
         if self.tab_revealed:
             # Use a fast overlay approach rather than slow per-pixel conversion.
-            # Create a desaturating multiply overlay to approximate grayscale quickly.
-            overlay = pg.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert_alpha()
-            overlay.fill((120, 120, 120))
-            # Multiply colors to desaturate
-            self.screen.blit(overlay, (0, 0), special_flags=pg.BLEND_RGB_MULT)
+            # Multiply colors with a cached desaturating overlay to approximate grayscale quickly.
+            # Under frame-time pressure the governor drops the overlay and only the fires are drawn.
+            if self.governor.settings["reveal_overlay"]:
+                self.screen.blit(self.get_grayscale_overlay(), (0, 0), special_flags=pg.BLEND_RGB_MULT)
 
             # Draw invisible fires on top in color
             for fire in self.level.fire_traps:
@@ -790,7 +2182,7 @@ class Game:
                     fire.draw(self.screen, self.world_x, reveal=True)
     
     def draw_gameover(self):
-        self.level.draw_background(self.screen, self.world_x)
+        self.level.draw_background(self.screen, self.world_x, self.governor.settings["background"])
         self.level.draw_ground(self.screen, self.world_x)
         self.level.draw_platforms(self.screen, self.world_x)
         # Draw only visible fires; invisible ones will be highlighted if TAB is active
@@ -817,32 +2209,81 @@ class Game:
 
         # If TAB reveal active on gameover screen: apply fast overlay then draw invisible fires colored
         if self.tab_revealed:
-            overlay = pg.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert_alpha()
-            overlay.fill((120, 120, 120))
-            self.screen.blit(overlay, (0, 0), special_flags=pg.BLEND_RGB_MULT)
+            if self.governor.settings["reveal_overlay"]:
+                self.screen.blit(self.get_grayscale_overlay(), (0, 0), special_flags=pg.BLEND_RGB_MULT)
             for fire in self.level.fire_traps:
                 if not fire.always_visible and not fire.is_hit:
                     fire.draw(self.screen, self.world_x, reveal=True)
     
+    def run_frame(self):
+        """One tick of the game: events, update, draw and the ghost race."""
+        self.perf.begin_frame()
+        self.handle_events()
+        self.tick_input = 0
+        
+        if self.state == "intro":
+            self.draw_intro()
+        elif self.state == "playing":
+            if pg.key.get_pressed()[pg.K_BACKSPACE] and self.rewind_buffer and not self.net:
+                # Hold BACKSPACE to rewind, one recorded tick per frame
+                self.restore(self.rewind_buffer.pop())
+            else:
+                self.update_playing()
+                self.rewind_buffer.append(self.snapshot())
+            self.draw_playing()
+        elif self.state == "gameover":
+            self.draw_gameover()
+        elif self.state == "leaderboard":
+            self.draw_leaderboard()
+        if self.net:
+            self.update_net()
+
+        if self.perf.show:
+            self.draw_perf()
+        pg.display.flip()
+        # Measured after the flip: on weak hardware presenting the frame is often its biggest cost
+        self.perf.end_frame()
+        if self.state == "playing" and self.governor.update(self.perf.frame_ms):
+            self.apply_quality()
+
     def run(self):
         while self.running:
             self.clock.tick(FPS)
-            self.handle_events()
-            
-            if self.state == "intro":
-                self.draw_intro()
-            elif self.state == "playing":
-                self.update_playing()
-                self.draw_playing()
-            elif self.state == "gameover":
-                self.draw_gameover()
-            
-            pg.display.flip()
+            self.run_frame()
         
+        self.level.close()
+        if self.history:
+            self.history.close()
+        self.perf.close()
+        if self.net:
+            self.net.close()
         pg.quit()
 
 
 # ========MAIN ENTRY
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    parser = argparse.ArgumentParser(description="Time Runner")
+    parser.add_argument("level", nargs="?", help="tile map level file, e.g. levels/01.txt")
+    parser.add_argument("--host", type=int, nargs="?", const=NET_PORT, metavar="PORT",
+                        help="host a ghost race: start a local relay and play")
+    parser.add_argument("--join", metavar="HOST:PORT", help="join a ghost race")
+    parser.add_argument("--relay", type=int, nargs="?", const=NET_PORT, metavar="PORT",
+                        help="run only the relay server")
+    args = parser.parse_args()
+
+    if args.relay is not None:
+        # Headless: shut SDL down so it releases its SIGINT/SIGTERM handlers and Ctrl+C works
+        pg.quit()
+        print(f"Time Runner relay listening on port {args.relay}")
+        asyncio.run(RelayServer(random.randrange(2 ** 32)).serve("0.0.0.0", args.relay))
+    else:
+        net = None
+        if args.host is not None:
+            # Listen on all interfaces so other machines can --join
+            start_local_relay(random.randrange(2 ** 32), args.host, "0.0.0.0")
+            net = NetClient("127.0.0.1", args.host)
+        elif args.join:
+            host, _, port = args.join.rpartition(":")
+            net = NetClient(host or "127.0.0.1", int(port))
+        game = Game(level_path=args.level, net=net)
+        game.run()
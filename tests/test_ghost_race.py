@@ -0,0 +1,215 @@
+"""Ghost racing over a loopback relay: every racer's ghost must end up exactly where the racer is."""
+import asyncio
+import functools
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame as pg
+import pytest
+
+import main
+
+START_X = 42
+
+
+@pytest.fixture(scope="module", autouse=True)
+def display():
+    pg.display.set_mode((main.SCREEN_WIDTH, main.SCREEN_HEIGHT))
+
+
+@pytest.fixture
+def relay():
+    server = main.start_local_relay(1234, port=0)
+    yield server
+    server.close()
+    assert not server.thread.is_alive()
+
+
+class Racer:
+    """A client as Game drives it, minus the rendering. Its own runner uses the ghost physics,
+    so a correct ghost of it matches exactly."""
+    def __init__(self, relay):
+        self.net = main.NetClient("127.0.0.1", relay.port)
+        self.level = main.Level(seed=self.net.seed)
+        self.runner = main.GhostRunner(self.net.player_id, START_X, self.net.start_tick)
+        self.tick = self.net.start_tick
+        self.ghosts = {}
+        self.history = {}  # tick -> runner state after it
+
+    def step(self, mask):
+        mask |= main.INPUT_PLAYING
+        self.runner.step(mask, self.level)
+        self.net.send_input(self.tick, mask)
+        if self.tick % main.KEYFRAME_TICKS == 0:
+            self.net.send_keyframe(self.tick, mask, self.runner.get_state())
+        self.history[self.tick] = self.runner.get_state()
+        self.tick += 1
+        self.update_ghosts()
+
+    def update_ghosts(self):
+        main.apply_net_events(self.ghosts, self.net.poll(), START_X)
+        for ghost in self.ghosts.values():
+            ghost.advance(self.tick, self.level)
+
+    def close(self):
+        self.net.close()
+        self.level.close()
+
+
+def wait_until(condition, poll=lambda: None):
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+        poll()
+    return condition()
+
+
+def settle(racers):
+    """Deliver everything sent so far and let the ghosts catch up. Racers are not stepped, so
+    a ghost only reaches its observer's tick if both racers count the same ticks."""
+    def poll():
+        for racer in racers:
+            racer.update_ghosts()
+    wait_until(lambda: all(ghost.tick == racer.tick and not ghost.predicted
+                           for racer in racers for ghost in racer.ghosts.values()), poll)
+
+
+def assert_ghosts_match(racers):
+    by_id = {racer.net.player_id: racer for racer in racers}
+    for racer in racers:
+        assert set(racer.ghosts) == set(by_id) - {racer.net.player_id}
+        for player_id, ghost in racer.ghosts.items():
+            other = by_id[player_id]
+            assert ghost.tick == racer.tick == other.tick
+            assert not ghost.predicted
+            assert ghost.get_state() == other.history[ghost.tick - 1]
+
+
+def test_ghosts_match_racers(relay):
+    racers = [Racer(relay) for _ in range(3)]
+    rng = random.Random(0)
+    plans = [[rng.choice([1, 1, 1, 0, 2]) for _ in range(40)] for _ in racers]
+    try:
+        for frame in range(600):
+            for i, racer in enumerate(racers):
+                mask = plans[i][frame // 15 % 40]
+                if frame % (23 + i) == 0:
+                    mask |= main.INPUT_JUMP
+                racer.step(mask)
+        settle(racers)
+        assert_ghosts_match(racers)
+    finally:
+        for racer in racers:
+            racer.close()
+
+
+def test_late_joiner_sees_runner_in_progress(relay):
+    first = Racer(relay)
+    racers = [first]
+    try:
+        for frame in range(300):
+            first.step(main.INPUT_RIGHT | (main.INPUT_JUMP if frame % 40 == 0 else 0))
+        # The first racer ran far faster than the relay clock; the joiner still starts on its tick
+        assert wait_until(lambda: relay.ticks.get(first.net.player_id) == first.tick - 1)
+        late = Racer(relay)
+        racers.append(late)
+        assert late.tick == first.tick
+        for frame in range(300):
+            first.step(main.INPUT_RIGHT)
+            late.step(0)
+        settle(racers)
+        assert_ghosts_match(racers)
+        assert late.ghosts[first.net.player_id].world_x > 0
+        # The late joiner's ghost starts near the present and drops inputs it has simulated
+        assert len(late.ghosts[first.net.player_id].inputs) <= 2 * main.FPS
+    finally:
+        for racer in racers:
+            racer.close()
+
+
+def test_ghost_follows_a_game_through_death_and_restart(relay, monkeypatch, tmp_path):
+    """Drive two real Games over the relay: B's ghost of A must match A's player on every
+    tick, on the intro screen, after a mid-air game over and after a restart."""
+    monkeypatch.setattr(main, "RunHistory", functools.partial(main.RunHistory, str(tmp_path / "runs.db")))
+    games = [main.Game(net=main.NetClient("127.0.0.1", relay.port)) for _ in range(2)]
+    a, b = games
+    masks = iter([])
+    a.read_input = lambda: next(masks, 0)
+    b.read_input = lambda: main.INPUT_RIGHT
+    a_states = {}
+
+    def caught_up():
+        """Hold both games on this tick until B's ghost of A has all of A's input."""
+        main.apply_net_events(b.ghosts, b.net.poll(), b.level.tile_w + 10)
+        ghost = b.ghosts.get(a.net.player_id)
+        if not ghost:
+            return False
+        ghost.advance(b.net_tick, b.level)
+        return ghost.tick == b.net_tick and not ghost.predicted
+
+    def frames(n, script=()):
+        """Run n frames of both games, then check the ghost against A at the same tick."""
+        nonlocal masks
+        masks = iter(script)
+        for _ in range(n):
+            for game in games:
+                game.run_frame()
+            a_states[a.net_tick - 1] = main.runner_state(a.player, a.world_x)
+            time.sleep(0.002)
+            ghost = b.ghosts.get(a.net.player_id)
+            if ghost:
+                # The newest state the ghost knows for certain: before its first guess, if any
+                tick, _, state = ghost.predicted[0] if ghost.predicted else (ghost.tick, None, ghost.get_state())
+                assert state == a_states[tick - 1]
+        assert a.net_tick == b.net_tick
+        assert wait_until(caught_up)
+        assert b.ghosts[a.net.player_id].get_state() == main.runner_state(a.player, a.world_x)
+
+    try:
+        b.start_run()
+        frames(30)
+        a.start_run()
+        run = [main.INPUT_RIGHT | (main.INPUT_JUMP if i % 25 == 0 else 0) for i in range(120)]
+        frames(140, run + [main.INPUT_LEFT] * 20)
+        frames(6, [main.INPUT_RIGHT | main.INPUT_JUMP] + [main.INPUT_LEFT] * 5)
+        assert a.state == "playing" and a.player.in_air
+        a.game_over()
+        frames(30)
+        a.reset()
+        frames(20)
+        a.start_run()
+        frames(60, [main.INPUT_LEFT] * 10 + [main.INPUT_RIGHT | main.INPUT_JUMP] * 50)
+    finally:
+        for game in games:
+            game.level.close()
+            game.history.close()
+            game.perf.close()
+            game.net.close()
+
+
+def test_player_ids_are_reused_and_a_full_race_is_refused(relay):
+    async def connect():
+        reader, writer = await asyncio.open_connection("127.0.0.1", relay.port)
+        try:
+            payload = await main.read_message(reader)
+        except asyncio.IncompleteReadError:
+            payload = None
+        return writer, payload and main.NET_WELCOME.unpack(payload)[1]
+
+    async def race():
+        joined = [await connect() for _ in range(main.MAX_RACERS)]
+        assert [player_id for _, player_id in joined] == list(range(main.MAX_RACERS))
+        writer, refused = await connect()
+        writer.close()
+        assert refused is None
+        joined[7][0].close()
+        await asyncio.sleep(0.1)
+        writer, reused = await connect()
+        assert reused == 7
+        for writer, _ in joined + [(writer, reused)]:
+            writer.close()
+
+    asyncio.run(race())